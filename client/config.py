@@ -5,14 +5,25 @@ Handles loading of environment variables, API keys, and server configurations.
 """
 
 import os
-from typing import Dict, Any, Optional
+import threading
+import tomllib
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional, Tuple
 from dataclasses import dataclass
-from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
+# Whether the .env file has been loaded into the environment yet
+_env_loaded = False
 
-@dataclass
+def _load_env():
+    """Load environment variables from .env file (once, on first config load)"""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+
+@dataclass(slots=True, frozen=True)
 class ServerConfig:
     """Configuration for an MCP server"""
     name: str
@@ -30,38 +41,59 @@ class ClientConfig:
     response_temperature: float
     streamlit_port: int
     log_level: str
-    servers: Dict[str, ServerConfig]
+    servers: Mapping[str, ServerConfig]
+    # Also reuse cached Gemini replies in the sampling/root_elicitation modes
+    cache_sampled_responses: bool = False
+
+# Server definitions, unless MCP_SERVERS_FILE names another file
+DEFAULT_SERVERS_FILE = os.path.join(os.path.dirname(__file__), "servers.toml")
+
+def servers_file() -> str:
+    """Path of the server definitions (MCP_SERVERS_FILE may be set in .env)"""
+    _load_env()
+    return os.getenv("MCP_SERVERS_FILE", DEFAULT_SERVERS_FILE)
+
+@lru_cache(maxsize=1)
+def _parse_servers(path: str, mtime: float) -> Mapping[str, ServerConfig]:
+    """Parse the servers file; mtime is part of the cache key so edits are re-read"""
+    with open(path, "rb") as f:
+        raw = tomllib.load(f)
+    
+    servers = {
+        name: ServerConfig(
+            name=name,
+            transport=entry["transport"],
+            host=entry.get("host"),
+            port=entry.get("port"),
+            command=entry.get("command"),
+            args=entry.get("args")
+        )
+        for name, entry in raw.items()
+    }
+    return MappingProxyType(servers)
+
+def load_servers(path: Optional[str] = None) -> Mapping[str, ServerConfig]:
+    """Load server configurations, re-parsing only when the file has changed"""
+    if path is None:
+        path = servers_file()
+    return _parse_servers(path, os.path.getmtime(path))
 
 def load_config() -> ClientConfig:
     """Load configuration from environment variables"""
+    _load_env()
+    
     # TODO: Load API keys
     gemini_api_key = os.getenv("GOOGLE_API_KEY", "")
     
     # TODO: Load client settings
-    gemini_model = os.getenv("GEMINI_MODEL", "gemini-pro")
+    gemini_model = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
     response_temperature = float(os.getenv("RESPONSE_TEMPERATURE", "0.7"))
     streamlit_port = int(os.getenv("STREAMLIT_PORT", "8501"))
     log_level = os.getenv("LOG_LEVEL", "INFO")
+    cache_sampled_responses = os.getenv("CACHE_SAMPLED_RESPONSES", "false").lower() in ("1", "true", "yes")
     
-    # Get the current working directory and virtual environment python
-    import sys
-    python_executable = sys.executable
-    
-    # TODO: Load server configurations
-    servers = {
-        "personal_assistant": ServerConfig(
-            name="personal_assistant",
-            transport="http",
-            host="127.0.0.1",
-            port=8001
-        ),
-        "knowledge_base": ServerConfig(
-            name="knowledge_base",
-            transport="http",
-            host="127.0.0.1",
-            port=8002
-        )
-    }
+    # Load server configurations
+    servers = load_servers()
     
     return ClientConfig(
         gemini_api_key=gemini_api_key,
@@ -69,9 +101,30 @@ def load_config() -> ClientConfig:
         response_temperature=response_temperature,
         streamlit_port=streamlit_port,
         log_level=log_level,
-        servers=servers
+        servers=servers,
+        cache_sampled_responses=cache_sampled_responses
     )
 
+def _validate_stdio(server_name: str, server_config: ServerConfig):
+    """Validate a stdio server configuration"""
+    if not server_config.command:
+        raise ValueError(f"Command not specified for stdio server {server_name}")
+
+def _validate_http(server_name: str, server_config: ServerConfig):
+    """Validate an HTTP server configuration"""
+    if not server_config.host or not server_config.port:
+        raise ValueError(f"Host and port required for HTTP server {server_name}")
+
+def _raise_unsupported(server_name: str, server_config: ServerConfig):
+    """Reject a server configuration with an unknown transport"""
+    raise ValueError(f"Unsupported transport type: {server_config.transport}")
+
+# Transport name -> validator
+_VALIDATORS = {
+    "stdio": _validate_stdio,
+    "http": _validate_http,
+}
+
 def validate_config(config: ClientConfig) -> bool:
     """Validate that all required configuration is present"""
     # TODO: Check for required API keys
@@ -80,24 +133,35 @@ def validate_config(config: ClientConfig) -> bool:
     
     # TODO: Validate server configurations
     for server_name, server_config in config.servers.items():
-        if server_config.transport == "stdio":
-            if not server_config.command:
-                raise ValueError(f"Command not specified for stdio server {server_name}")
-        elif server_config.transport == "http":
-            if not server_config.host or not server_config.port:
-                raise ValueError(f"Host and port required for HTTP server {server_name}")
-        else:
-            raise ValueError(f"Unsupported transport type: {server_config.transport}")
+        validator = _VALIDATORS.get(server_config.transport, _raise_unsupported)
+        validator(server_name, server_config)
     
     return True
 
-# Global config instance
+# Global config instance, and the (path, mtime) of the servers file it was
+# loaded with
 _config: Optional[ClientConfig] = None
+_config_source: Optional[Tuple[str, float]] = None
+_config_lock = threading.Lock()
+
+def _servers_source() -> Tuple[str, float]:
+    """The servers file's path and current mtime"""
+    path = servers_file()
+    return path, os.path.getmtime(path)
 
 def get_config() -> ClientConfig:
-    """Get the global configuration instance"""
-    global _config
-    if _config is None:
-        _config = load_config()
-        validate_config(_config)
+    """Get the global configuration instance, reloaded if the servers file changed
+    
+    Costs one stat per call; the manager reads server definitions when it
+    initializes, so edits apply to the next initialize().
+    """
+    global _config, _config_source
+    source = _servers_source()
+    if _config is None or source != _config_source:
+        # Double-checked so concurrent callers only load the config once
+        with _config_lock:
+            if _config is None or source != _config_source:
+                config = load_config()
+                validate_config(config)
+                _config, _config_source = config, source
     return _config
\ No newline at end of file
@@ -4,17 +4,132 @@ HTTP MCP Connection Manager
 Handles connections to HTTP-based MCP servers using REST API calls.
 """
 
+from __future__ import annotations
+
 import asyncio
-import json
-import httpx
-from typing import Dict, List, Any, Optional, Union
-from datetime import datetime
+import hashlib
+import time
+import weakref
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Dict, List, Any, Mapping, Optional, Set, Tuple, Union
+from pathlib import Path
 import logging
+import orjson
 
 from client.config import ServerConfig, get_config
 from client.utils import logger, RetryConfig, retry_with_exponential_backoff, CircuitBreaker
 from shared.models import MCPConnection, ConnectionStatus
 
+if TYPE_CHECKING:
+    import httpx
+
+# How long introspected capabilities are served from memory before re-fetching
+CAPS_TTL = 60.0
+
+# Per-probe timeout for periodic health checks, so one dead server can't stall the rest
+HEALTH_CHECK_TIMEOUT = 2.0
+
+# Idle time after which pooled connections may have been closed (the pool's
+# keep-alive expiry is 60s), so the next call would pay for a new handshake
+POOL_WARM_IDLE = 30.0
+
+# Last known capabilities, used to serve stale data while servers are revalidated
+CAPS_CACHE_FILE = Path.home() / ".mcp" / "caps_cache.json"
+
+# How long initialize() waits for a server it already has persisted capabilities
+# for; a slower one finishes connecting in the background
+STARTUP_CONNECT_TIMEOUT = HEALTH_CHECK_TIMEOUT
+
+class ConnectRetryConfig(RetryConfig):
+    """Retry only failures to connect, where the request never reached the server
+    
+    Anything later may already have been applied (add_task is not idempotent),
+    and the servers retry their own transient upstream failures.
+    """
+    def is_retryable(self, error: Exception) -> bool:
+        import httpx
+        return isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout))
+
+# Retries for tool/resource/prompt calls, before the failure counts against the
+# server's circuit breaker
+RPC_RETRY = ConnectRetryConfig(max_attempts=3, base_delay=0.5, max_delay=8.0)
+
+# Headers for request bodies pre-serialized with orjson
+_JSON_HEADERS = {"content-type": "application/json"}
+
+# One pooled HTTP client per event loop; entries disappear with their loop
+_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def _create_http_client() -> httpx.AsyncClient:
+    """Create an HTTP client with a large keep-alive pool and HTTP/2 enabled"""
+    # Imported here so importing this module doesn't pay for httpx
+    import httpx
+    
+    transport = httpx.AsyncHTTPTransport(
+        http2=True,
+        retries=0,  # retries are handled by retry_with_exponential_backoff
+        limits=httpx.Limits(
+            max_connections=100,
+            max_keepalive_connections=50,
+            keepalive_expiry=60.0
+        )
+    )
+    return httpx.AsyncClient(
+        # Longer than a server's worst case for a tool whose upstream API call
+        # it retries (3 x 10s attempts plus backoff)
+        timeout=httpx.Timeout(45.0, connect=5.0),
+        transport=transport
+    )
+
+
+def _retrieve_exception(task: asyncio.Future):
+    """Done callback for background connects, whose failures are already logged"""
+    if not task.cancelled():
+        task.exception()
+
+
+def _write_caps_file(data: bytes):
+    """Atomically replace CAPS_CACHE_FILE (blocking; run in a worker thread)"""
+    CAPS_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    temp_file = CAPS_CACHE_FILE.with_suffix('.tmp')
+    temp_file.write_bytes(data)
+    temp_file.replace(CAPS_CACHE_FILE)
+
+
+def _fingerprint_capabilities(capabilities: Dict[str, Any]) -> bytes:
+    """Cheap content fingerprint used to detect unchanged capabilities"""
+    return hashlib.blake2b(
+        orjson.dumps(capabilities, option=orjson.OPT_SORT_KEYS),
+        digest_size=16
+    ).digest()
+
+
+@dataclass(frozen=True)
+class ServerEndpoints:
+    """Fully-built endpoint URLs for one server, computed once at connect time"""
+    health: str
+    tools: str
+    resources: str
+    prompts: str
+    tools_call: str
+    resources_read: str
+    prompts_get: str
+    
+    @classmethod
+    def from_base_url(cls, base_url: str) -> "ServerEndpoints":
+        """Build all endpoint URLs from a server's base URL"""
+        return cls(
+            health=f"{base_url}/health",
+            tools=f"{base_url}/tools",
+            resources=f"{base_url}/resources",
+            prompts=f"{base_url}/prompts",
+            tools_call=f"{base_url}/tools/call",
+            resources_read=f"{base_url}/resources/read",
+            prompts_get=f"{base_url}/prompts/get"
+        )
+
 
 class HTTPMCPManager:
     """Manages HTTP connections to MCP servers"""
@@ -22,110 +137,154 @@ class HTTPMCPManager:
     def __init__(self):
         self.connections: Dict[str, MCPConnection] = {}
         self.base_urls: Dict[str, str] = {}
+        self.endpoints: Dict[str, ServerEndpoints] = {}
+        # One breaker per server, shared by every RPC made to it
+        self._breakers: Dict[str, CircuitBreaker] = {}
         self.capabilities_cache: Dict[str, Dict[str, Any]] = {}
+        self._caps_cache_ts: Dict[str, float] = {}
+        self._caps_fp: Dict[str, bytes] = {}
+        self._etags: Dict[Tuple[str, str], str] = {}
+        self._revalidating: Dict[str, asyncio.Task] = {}
+        # Reverse indexes: capability name/uri -> providing servers, in the order
+        # they were indexed; and server -> its (tool, resource, prompt) keys
+        self._tool_index: Dict[str, List[str]] = {}
+        self._resource_index: Dict[str, List[str]] = {}
+        self._prompt_index: Dict[str, List[str]] = {}
+        self._indexed_keys: Dict[str, Tuple[List[str], List[str], List[str]]] = {}
+        # Names of servers whose connection is currently CONNECTED
+        self._connected: Set[str] = set()
+        # Bumped whenever the available capabilities change (cached capabilities or
+        # the connected set); keys the get_available_all memo
+        self._caps_version = 0
+        self._available_memo: Optional[Tuple[Any, Tuple[Dict, Dict, Dict]]] = None
+        self._counts_memo: Optional[Tuple[int, Mapping[str, int]]] = None
+        # Read-only views handed out by get_all_*; rebuilt only when the dicts change
+        self._connections_snapshot: Mapping[str, MCPConnection] = MappingProxyType({})
+        self._caps_snapshot: Mapping[str, Dict[str, Any]] = MappingProxyType({})
+        # Monotonic time of the last request to any server, and the running warm-up
+        self._last_request = 0.0
+        self._warming: Optional[asyncio.Task] = None
+        # Connects still running after initialize() returned
+        self._connecting: Dict[str, asyncio.Task] = {}
         self._lock = asyncio.Lock()
+        # Serializes writes of CAPS_CACHE_FILE
+        self._persist_lock = asyncio.Lock()
         self.http_client = None
         self._client_initialized = False
     
     async def _ensure_http_client(self):
         """Ensure HTTP client is initialized and compatible with current event loop"""
-        try:
-            # Get current event loop ID for comparison
-            current_loop = asyncio.get_running_loop()
-            current_loop_id = id(current_loop)
-            
-            # Check if we need a new client
-            need_new_client = (
-                self.http_client is None or
-                self.http_client.is_closed or
-                getattr(self, '_current_loop_id', None) != current_loop_id
-            )
-            
-            if need_new_client:
-                # Close existing client safely
-                if self.http_client is not None:
-                    try:
-                        if not self.http_client.is_closed:
-                            await self.http_client.aclose()
-                    except Exception as e:
-                        logger.warning(f"Error closing existing HTTP client: {e}")
-                
-                # Create new client in current event loop
-                self.http_client = httpx.AsyncClient(timeout=30.0)
-                self._current_loop_id = current_loop_id
-                self._client_initialized = True
-                logger.debug(f"Created new HTTP client for event loop {current_loop_id}")
-                
-        except Exception as e:
-            logger.error(f"Error ensuring HTTP client: {e}")
-            # Fallback: always create a new client
-            try:
-                self.http_client = httpx.AsyncClient(timeout=30.0)
-                self._current_loop_id = id(asyncio.get_running_loop())
-                self._client_initialized = True
-            except Exception as fallback_error:
-                logger.error(f"Fallback HTTP client creation failed: {fallback_error}")
-                raise
+        current_loop = asyncio.get_running_loop()
+        client = _http_clients.get(current_loop)
+        
+        if client is None or client.is_closed:
+            client = _create_http_client()
+            _http_clients[current_loop] = client
+            logger.debug(f"Created new HTTP client for event loop {id(current_loop)}")
+        
+        self.http_client = client
+        self._client_initialized = True
 
     async def initialize(self):
         """Initialize connections to all configured HTTP servers"""
         await self._ensure_http_client()
         config = get_config()
         
-        for server_name, server_config in config.servers.items():
-            try:
-                await self.connect_server(server_name, server_config)
-            except Exception as e:
-                logger.error(f"Failed to connect to server {server_name}: {e}")
+        # Last known capabilities are served as soon as their server passes its
+        # health check; they are revalidated in the background
+        await self._load_persisted_capabilities(config.servers.keys())
+        
+        # Connect to all servers concurrently; one failure shouldn't block the
+        # others (connect_server logs its own failures)
+        tasks = {
+            name: asyncio.ensure_future(self.connect_server(name, server_config))
+            for name, server_config in config.servers.items()
+        }
+        for task in tasks.values():
+            task.add_done_callback(_retrieve_exception)
+        
+        # Servers without persisted capabilities have nothing to serve until they
+        # are introspected, so wait for those; wait only briefly for the others
+        # and let slow ones finish in the background
+        unknown = [task for name, task in tasks.items() if name not in self.capabilities_cache]
+        known = [task for name, task in tasks.items() if name in self.capabilities_cache]
+        if unknown:
+            await asyncio.wait(unknown)
+        if known:
+            await asyncio.wait(known, timeout=STARTUP_CONNECT_TIMEOUT)
+        
+        for name, task in tasks.items():
+            if not task.done():
+                logger.info(f"Still connecting to server {name}; continuing in the background")
+                self._connecting[name] = task
+                task.add_done_callback(lambda _t, name=name: self._connecting.pop(name, None))
     
     async def connect_server(self, server_name: str, server_config: ServerConfig):
         """Connect to a single HTTP MCP server"""
+        # Only the bookkeeping is done under the lock; the network round-trips
+        # below run unlocked so several servers can connect in parallel
         async with self._lock:
-            try:
-                # Create connection record
-                connection = MCPConnection(
-                    server_name=server_name,
-                    transport_type="http",
-                    connection_status=ConnectionStatus.CONNECTING.value,
-                    host=server_config.host,
-                    port=server_config.port
-                )
-                
-                self.connections[server_name] = connection
-                
-                # Build base URL
-                base_url = f"http://{server_config.host}:{server_config.port}"
-                self.base_urls[server_name] = base_url
-                
-                # Test connection with health check
-                await self._health_check_server(server_name)
-                
-                # Perform introspection
+            # Create connection record
+            connection = MCPConnection(
+                server_name=server_name,
+                transport_type="http",
+                connection_status=ConnectionStatus.CONNECTING.value,
+                host=server_config.host,
+                port=server_config.port,
+                on_status_change=self._on_status_change
+            )
+            
+            self.connections[server_name] = connection
+            self._set_connected(server_name, False)
+            
+            # Build base URL
+            base_url = f"http://{server_config.host}:{server_config.port}"
+            self.base_urls[server_name] = base_url
+            self.endpoints[server_name] = ServerEndpoints.from_base_url(base_url)
+            self._breakers.setdefault(
+                server_name,
+                CircuitBreaker(failure_threshold=3, recovery_timeout=30.0)
+            )
+            self._refresh_snapshots()
+        
+        try:
+            # Test connection with health check
+            await self._health_check_server(server_name)
+            
+            # Perform introspection, or revalidate in the background if we
+            # already have (possibly stale) capabilities to serve
+            if server_name in self.capabilities_cache:
+                connection.capabilities = self.capabilities_cache[server_name]
+                self._index_capabilities(server_name)
+                self._schedule_revalidation(server_name)
+            else:
                 await self._introspect_server(server_name)
-                
-                # Update connection status
-                connection.update_status(ConnectionStatus.CONNECTED.value)
-                logger.info(f"Successfully connected to HTTP server: {server_name} at {base_url}")
-                
-            except Exception as e:
-                if server_name in self.connections:
-                    self.connections[server_name].update_status(
-                        ConnectionStatus.ERROR.value,
-                        str(e)
-                    )
-                logger.error(f"Failed to connect to server {server_name}: {e}")
-                raise
+            
+            # Update connection status
+            async with self._lock:
+                self._set_status(server_name, ConnectionStatus.CONNECTED.value)
+            logger.info(f"Successfully connected to HTTP server: {server_name} at {base_url}")
+            
+        except Exception as e:
+            async with self._lock:
+                self._set_status(server_name, ConnectionStatus.ERROR.value, str(e))
+                # Don't carry persisted capabilities for a server that is down
+                self._forget_capabilities(server_name)
+            logger.error(f"Failed to connect to server {server_name}: {e}")
+            raise
     
-    async def _health_check_server(self, server_name: str):
+    async def _health_check_server(self, server_name: str, timeout: Optional[float] = None):
         """Perform health check on a server"""
         await self._ensure_http_client()
-        base_url = self.base_urls[server_name]
+        # Only override the client's timeout when asked to (None would disable it)
+        kwargs = {"timeout": timeout} if timeout is not None else {}
         
         try:
-            response = await self.http_client.get(f"{base_url}/health")
+            self._last_request = time.monotonic()
+            response = await self.http_client.get(self.endpoints[server_name].health, **kwargs)
             response.raise_for_status()
             
-            health_data = response.json()
+            health_data = orjson.loads(response.content)
             logger.info(f"Health check for {server_name}: {health_data}")
             
         except Exception as e:
@@ -133,64 +292,278 @@ class HTTPMCPManager:
             raise
     
     @retry_with_exponential_backoff(RetryConfig(max_attempts=3))
-    async def _introspect_server(self, server_name: str):
+    async def _introspect_server(self, server_name: str, force: bool = False):
         """Perform introspection on a server to discover capabilities"""
+        cached = self.capabilities_cache.get(server_name)
+        if (
+            not force and cached is not None and
+            time.monotonic() - self._caps_cache_ts.get(server_name, 0.0) < CAPS_TTL
+        ):
+            return cached
+        
         await self._ensure_http_client()
-        base_url = self.base_urls[server_name]
+        endpoint_urls = self.endpoints[server_name]
+        cached = cached or {}
         capabilities = {}
         
         try:
-            # Get tools
-            tools_response = await self.http_client.get(f"{base_url}/tools")
-            tools_response.raise_for_status()
-            tools_data = tools_response.json()
-            capabilities["tools"] = tools_data.get("tools", [])
+            # Fetch tools, resources and prompts concurrently, revalidating with
+            # If-None-Match when the server handed us an ETag last time
+            endpoints = ("tools", "resources", "prompts")
+            requests = []
+            for endpoint in endpoints:
+                headers = {}
+                etag = self._etags.get((server_name, endpoint))
+                if etag and endpoint in cached:
+                    headers["If-None-Match"] = etag
+                requests.append(self.http_client.get(getattr(endpoint_urls, endpoint), headers=headers))
+            responses = await asyncio.gather(*requests, return_exceptions=True)
             
-            # Get resources
-            resources_response = await self.http_client.get(f"{base_url}/resources")
-            resources_response.raise_for_status()
-            resources_data = resources_response.json()
-            capabilities["resources"] = resources_data.get("resources", [])
+            errors = []
+            for endpoint, response in zip(endpoints, responses):
+                try:
+                    if isinstance(response, Exception):
+                        raise response
+                    if response.status_code == 304:
+                        # Unchanged since the last fetch - skip parsing entirely
+                        capabilities[endpoint] = cached.get(endpoint, [])
+                        continue
+                    response.raise_for_status()
+                    capabilities[endpoint] = orjson.loads(response.content).get(endpoint, [])
+                    etag = response.headers.get("etag")
+                    if etag:
+                        self._etags[(server_name, endpoint)] = etag
+                except Exception as e:
+                    # Keep whatever the other endpoints returned, and the last
+                    # known listing for this one
+                    logger.warning(f"Failed to fetch /{endpoint} from {server_name}: {e}")
+                    capabilities[endpoint] = cached.get(endpoint, [])
+                    errors.append(e)
             
-            # Get prompts
-            prompts_response = await self.http_client.get(f"{base_url}/prompts")
-            prompts_response.raise_for_status()
-            prompts_data = prompts_response.json()
-            capabilities["prompts"] = prompts_data.get("prompts", [])
+            if len(errors) == len(endpoints):
+                raise errors[0]
+            
+            # A partial result is not fresh: leave the TTL expired so the next
+            # lookup revalidates, and don't persist it
+            caps_ts = time.monotonic() if not errors else self._caps_cache_ts.get(server_name, 0.0)
+            
+            # Byte-identical capabilities: just extend the TTL and leave the
+            # indexes, snapshots and persisted copy alone
+            fingerprint = _fingerprint_capabilities(capabilities)
+            if fingerprint == self._caps_fp.get(server_name) and server_name in self.capabilities_cache:
+                self._caps_cache_ts[server_name] = caps_ts
+                logger.debug(f"Capabilities unchanged for {server_name}")
+                return self.capabilities_cache[server_name]
+            self._caps_fp[server_name] = fingerprint
             
             # Cache capabilities
             self.capabilities_cache[server_name] = capabilities
+            self._caps_cache_ts[server_name] = caps_ts
+            self._caps_version += 1
+            self._refresh_snapshots()
+            self._index_capabilities(server_name)
             
             # Update connection record
             if server_name in self.connections:
                 self.connections[server_name].capabilities = capabilities
             
+            if not errors:
+                await self._persist_capabilities()
+            
             logger.info(f"Introspected server {server_name}: "
                        f"{len(capabilities.get('tools', []))} tools, "
                        f"{len(capabilities.get('resources', []))} resources, "
                        f"{len(capabilities.get('prompts', []))} prompts")
+            
+            return capabilities
         
         except Exception as e:
             logger.error(f"Failed to introspect server {server_name}: {e}")
             raise
     
+    def _refresh_snapshots(self):
+        """Rebuild the read-only connection/capability views after a mutation
+        
+        The capability view only holds connected servers.
+        """
+        self._connections_snapshot = MappingProxyType(dict(self.connections))
+        self._caps_snapshot = MappingProxyType({
+            name: caps for name, caps in self.capabilities_cache.items()
+            if name in self._connected
+        })
+    
+    def _forget_capabilities(self, server_name: str):
+        """Drop everything cached about a server's capabilities"""
+        if server_name in self.capabilities_cache:
+            del self.capabilities_cache[server_name]
+            self._caps_version += 1
+        self._caps_cache_ts.pop(server_name, None)
+        self._caps_fp.pop(server_name, None)
+        self._unindex_capabilities(server_name)
+        for endpoint in ("tools", "resources", "prompts"):
+            self._etags.pop((server_name, endpoint), None)
+        self._refresh_snapshots()
+    
+    def _set_status(self, server_name: str, status: str, error_message: Optional[str] = None):
+        """Update a server's connection status"""
+        connection = self.connections.get(server_name)
+        if connection is None:
+            return
+        connection.update_status(status, error_message)
+    
+    def _on_status_change(self, connection: MCPConnection):
+        """Keep the connected set in sync with the current connection records"""
+        server_name = connection.server_name
+        if self.connections.get(server_name) is not connection:
+            # A replaced record reporting late must not override the new one
+            return
+        self._set_connected(server_name, connection.is_connected())
+    
+    def _set_connected(self, server_name: str, connected: bool):
+        """Add/remove a server from the connected set, bumping the version on change"""
+        if connected == (server_name in self._connected):
+            return
+        if connected:
+            self._connected.add(server_name)
+        else:
+            self._connected.discard(server_name)
+        self._caps_version += 1
+        self._refresh_snapshots()
+    
+    def _index_capabilities(self, server_name: str):
+        """Rebuild the reverse indexes for a server from its cached capabilities"""
+        self._unindex_capabilities(server_name)
+        capabilities = self.capabilities_cache.get(server_name, {})
+        keys = (
+            [tool.get("name") for tool in capabilities.get("tools", [])],
+            [resource.get("uri") for resource in capabilities.get("resources", [])],
+            [prompt.get("name") for prompt in capabilities.get("prompts", [])]
+        )
+        for index, index_keys in zip((self._tool_index, self._resource_index, self._prompt_index), keys):
+            for key in index_keys:
+                providers = index.setdefault(key, [])
+                if server_name not in providers:
+                    providers.append(server_name)
+        self._indexed_keys[server_name] = keys
+    
+    def _unindex_capabilities(self, server_name: str):
+        """Remove a server's entries from the reverse indexes (only its own keys are visited)"""
+        keys = self._indexed_keys.pop(server_name, None)
+        if keys is None:
+            return
+        for index, index_keys in zip((self._tool_index, self._resource_index, self._prompt_index), keys):
+            for key in index_keys:
+                providers = index.get(key)
+                if providers and server_name in providers:
+                    providers.remove(server_name)
+                    if not providers:
+                        del index[key]
+    
+    def _find_provider(self, index: Dict[str, List[str]], key: str) -> Optional[str]:
+        """First connected server in a reverse index entry"""
+        for server_name in index.get(key, ()):
+            if server_name in self._connected:
+                return server_name
+        return None
+    
+    def _schedule_revalidation(self, server_name: str):
+        """Re-introspect a server in the background, keeping stale capabilities on failure"""
+        if server_name in self._revalidating:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Called from sync code with no loop - nothing to schedule on
+            return
+        
+        async def revalidate():
+            try:
+                await self._introspect_server(server_name, force=True)
+            except Exception as e:
+                logger.warning(f"Revalidation failed for {server_name}, serving stale capabilities: {e}")
+            finally:
+                self._revalidating.pop(server_name, None)
+        
+        self._revalidating[server_name] = loop.create_task(revalidate())
+    
+    async def warm_up(self):
+        """Ping every connected server so the pool has open connections to each"""
+        await self._ensure_http_client()
+        self._last_request = time.monotonic()
+        server_names = list(self._connected)
+        results = await asyncio.gather(
+            *[
+                self.http_client.get(self.endpoints[name].health, timeout=HEALTH_CHECK_TIMEOUT)
+                for name in server_names
+            ],
+            return_exceptions=True
+        )
+        for server_name, result in zip(server_names, results):
+            if isinstance(result, Exception):
+                logger.debug(f"Warm-up ping failed for {server_name}: {result}")
+    
+    def schedule_warm_up(self):
+        """Run warm_up() in the background if the pool may have gone idle
+        
+        Meant to be called right before a slow step (e.g. an LLM call) that is
+        followed by MCP calls, so any reconnects overlap with it.
+        """
+        if self._warming is not None and not self._warming.done():
+            return
+        if time.monotonic() - self._last_request < POOL_WARM_IDLE:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._warming = loop.create_task(self.warm_up())
+    
+    async def _load_persisted_capabilities(self, server_names):
+        """Populate the capabilities cache from the last successful introspection
+        
+        Only servers in server_names (the configured ones) are loaded.
+        """
+        try:
+            persisted = orjson.loads(await asyncio.to_thread(CAPS_CACHE_FILE.read_bytes))
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"Could not load persisted capabilities from {CAPS_CACHE_FILE}: {e}")
+            return
+        
+        for server_name in server_names:
+            capabilities = persisted.get(server_name)
+            # No timestamp is recorded, so these are always treated as stale
+            if capabilities is not None and server_name not in self.capabilities_cache:
+                self.capabilities_cache[server_name] = capabilities
+                self._caps_fp[server_name] = _fingerprint_capabilities(capabilities)
+        self._caps_version += 1
+        self._refresh_snapshots()
+    
+    async def _persist_capabilities(self):
+        """Write the capabilities cache to disk for the next startup"""
+        # Serialized here, so the file matches the cache as of this call
+        data = orjson.dumps(self.capabilities_cache)
+        try:
+            async with self._persist_lock:
+                await asyncio.to_thread(_write_caps_file, data)
+        except Exception as e:
+            logger.warning(f"Could not persist capabilities to {CAPS_CACHE_FILE}: {e}")
+    
     async def disconnect_server(self, server_name: str):
         """Disconnect from a server"""
         async with self._lock:
             try:
                 # Update connection status
-                if server_name in self.connections:
-                    self.connections[server_name].update_status(
-                        ConnectionStatus.DISCONNECTED.value
-                    )
+                self._set_status(server_name, ConnectionStatus.DISCONNECTED.value)
                 
                 # Clear from base URLs
                 if server_name in self.base_urls:
                     del self.base_urls[server_name]
+                self.endpoints.pop(server_name, None)
                 
                 # Clear capabilities cache
-                if server_name in self.capabilities_cache:
-                    del self.capabilities_cache[server_name]
+                self._forget_capabilities(server_name)
                 
                 logger.info(f"Disconnected from server: {server_name}")
                 
@@ -199,6 +572,13 @@ class HTTPMCPManager:
     
     async def disconnect_all(self):
         """Disconnect from all servers"""
+        # Stop connects initialize() left running in the background
+        pending = list(self._connecting.values())
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.wait(pending)
+        
         for server_name in list(self.base_urls.keys()):
             await self.disconnect_server(server_name)
         
@@ -212,236 +592,224 @@ class HTTPMCPManager:
         """Get connection status for a server"""
         return self.connections.get(server_name)
     
-    def get_all_connections(self) -> Dict[str, MCPConnection]:
-        """Get all connection statuses"""
-        return self.connections.copy()
+    def get_all_connections(self) -> Mapping[str, MCPConnection]:
+        """Get all connection statuses (read-only view)"""
+        return self._connections_snapshot
     
     def is_server_connected(self, server_name: str) -> bool:
         """Check if a server is connected"""
-        connection = self.connections.get(server_name)
-        return connection is not None and connection.is_connected()
+        return server_name in self._connected
     
     def get_server_capabilities(self, server_name: str) -> Dict[str, Any]:
-        """Get cached capabilities for a server"""
+        """Get cached capabilities for a server, revalidating in the background if stale"""
+        if (
+            self.is_server_connected(server_name) and
+            time.monotonic() - self._caps_cache_ts.get(server_name, 0.0) >= CAPS_TTL
+        ):
+            self._schedule_revalidation(server_name)
         return self.capabilities_cache.get(server_name, {})
     
-    def get_all_capabilities(self) -> Dict[str, Dict[str, Any]]:
-        """Get capabilities for all connected servers"""
-        return self.capabilities_cache.copy()
+    def get_all_capabilities(self) -> Mapping[str, Dict[str, Any]]:
+        """Get capabilities for all connected servers (read-only view)"""
+        return self._caps_snapshot
     
-    @CircuitBreaker(failure_threshold=3, recovery_timeout=30.0)
-    async def call_tool(self, server_name: str, tool_name: str, arguments: Dict[str, Any]) -> Any:
-        """Call a tool on a specific server"""
+    @retry_with_exponential_backoff(RPC_RETRY)
+    async def _post(self, url: str, content: bytes) -> "httpx.Response":
+        """POST a pre-serialized JSON body, retrying only failures to connect"""
+        self._last_request = time.monotonic()
+        response = await self.http_client.post(url, content=content, headers=_JSON_HEADERS)
+        response.raise_for_status()
+        return response
+    
+    async def _rpc(self, server_name: str, endpoint: str, payload: Dict[str, Any],
+                   result_key: str, action: str) -> Any:
+        """POST a JSON payload to one of a server's endpoints and unwrap the result
+        
+        endpoint names a ServerEndpoints field (e.g. "tools_call"); action is
+        only used for the error log line.
+        """
         await self._ensure_http_client()
         
         if not self.is_server_connected(server_name):
             raise ConnectionError(f"Server {server_name} is not connected")
         
-        base_url = self.base_urls[server_name]
-        
-        try:
-            payload = {
-                "name": tool_name,
-                "arguments": arguments
-            }
-            
-            response = await self.http_client.post(
-                f"{base_url}/tools/call",
-                json=payload
-            )
-            response.raise_for_status()
-            
-            result = response.json()
-            
-            # Update last ping time
-            if server_name in self.connections:
-                self.connections[server_name].last_ping = datetime.utcnow()
-            
-            if result.get("success"):
-                return result.get("result", "")
-            else:
-                raise RuntimeError(result.get("error", "Unknown error"))
-            
-        except Exception as e:
-            logger.error(f"Error calling tool {tool_name} on server {server_name}: {e}")
-            # Update connection status on error
-            if server_name in self.connections:
-                self.connections[server_name].update_status(
-                    ConnectionStatus.ERROR.value,
-                    str(e)
+        # Only transport failures count against the breaker, which short-circuits
+        # a failing server until its recovery timeout; the connection status is
+        # left to the health checks, so the breaker gets to see every failure
+        async with self._breakers[server_name]:
+            try:
+                response = await self._post(
+                    getattr(self.endpoints[server_name], endpoint), orjson.dumps(payload)
                 )
-            raise
-    
-    @CircuitBreaker(failure_threshold=3, recovery_timeout=30.0)
-    async def read_resource(self, server_name: str, uri: str) -> str:
-        """Read a resource from a specific server"""
-        await self._ensure_http_client()
+                
+                result = orjson.loads(response.content)
+            except Exception as e:
+                logger.error(f"Error {action} on server {server_name}: {e}")
+                raise
         
-        if not self.is_server_connected(server_name):
-            raise ConnectionError(f"Server {server_name} is not connected")
+        # Update last ping time
+        if server_name in self.connections:
+            self.connections[server_name].last_ping = int(time.time())
         
-        base_url = self.base_urls[server_name]
+        if result.get("success"):
+            return result.get(result_key, "")
         
-        try:
-            payload = {"uri": uri}
-            
-            response = await self.http_client.post(
-                f"{base_url}/resources/read",
-                json=payload
-            )
-            response.raise_for_status()
-            
-            result = response.json()
-            
-            # Update last ping time
-            if server_name in self.connections:
-                self.connections[server_name].last_ping = datetime.utcnow()
-            
-            if result.get("success"):
-                return result.get("content", "")
-            else:
-                raise RuntimeError(result.get("error", "Unknown error"))
-            
-        except Exception as e:
-            logger.error(f"Error reading resource {uri} from server {server_name}: {e}")
-            # Update connection status on error
-            if server_name in self.connections:
-                self.connections[server_name].update_status(
-                    ConnectionStatus.ERROR.value,
-                    str(e)
-                )
-            raise
+        error = result.get("error", "Unknown error")
+        logger.error(f"Error {action} on server {server_name}: {error}")
+        raise RuntimeError(error)
+    
+    async def call_tool(self, server_name: str, tool_name: str, arguments: Dict[str, Any]) -> Any:
+        """Call a tool on a specific server"""
+        payload = {"name": tool_name, "arguments": arguments}
+        return await self._rpc(server_name, "tools_call", payload, "result", f"calling tool {tool_name}")
+    
+    async def read_resource(self, server_name: str, uri: str) -> str:
+        """Read a resource from a specific server"""
+        payload = {"uri": uri}
+        return await self._rpc(server_name, "resources_read", payload, "content", f"reading resource {uri}")
     
-    @CircuitBreaker(failure_threshold=3, recovery_timeout=30.0)
     async def get_prompt(self, server_name: str, prompt_name: str, arguments: Dict[str, str] = None) -> str:
         """Get a prompt from a specific server"""
-        await self._ensure_http_client()
-        
-        if not self.is_server_connected(server_name):
-            raise ConnectionError(f"Server {server_name} is not connected")
+        payload = {"name": prompt_name, "arguments": arguments or {}}
+        return await self._rpc(server_name, "prompts_get", payload, "prompt", f"getting prompt {prompt_name}")
+    
+    async def refresh_capabilities(self, server_name: str = None, force: bool = False, wait: bool = True):
+        """Refresh capabilities for one or all servers (served from cache within CAPS_TTL unless forced)
         
-        base_url = self.base_urls[server_name]
+        With wait=False the refresh happens in the background and callers keep
+        seeing the current (possibly stale) capabilities until it completes.
+        """
+        if not wait:
+            for name in ([server_name] if server_name else list(self.base_urls.keys())):
+                if self.is_server_connected(name):
+                    self._schedule_revalidation(name)
+            return
         
-        try:
-            payload = {
-                "name": prompt_name,
-                "arguments": arguments or {}
-            }
-            
-            response = await self.http_client.post(
-                f"{base_url}/prompts/get",
-                json=payload
-            )
-            response.raise_for_status()
-            
-            result = response.json()
-            
-            # Update last ping time
-            if server_name in self.connections:
-                self.connections[server_name].last_ping = datetime.utcnow()
-            
-            if result.get("success"):
-                return result.get("prompt", "")
-            else:
-                raise RuntimeError(result.get("error", "Unknown error"))
-            
-        except Exception as e:
-            logger.error(f"Error getting prompt {prompt_name} from server {server_name}: {e}")
-            # Update connection status on error
-            if server_name in self.connections:
-                self.connections[server_name].update_status(
-                    ConnectionStatus.ERROR.value,
-                    str(e)
-                )
-            raise
-    
-    async def refresh_capabilities(self, server_name: str = None):
-        """Refresh capabilities for one or all servers"""
         if server_name:
             if self.is_server_connected(server_name):
-                await self._introspect_server(server_name)
+                await self._introspect_server(server_name, force=force)
         else:
             for name in self.base_urls.keys():
                 if self.is_server_connected(name):
                     try:
-                        await self._introspect_server(name)
+                        await self._introspect_server(name, force=force)
                     except Exception as e:
                         logger.error(f"Failed to refresh capabilities for {name}: {e}")
     
     async def health_check(self):
         """Perform health check on all connections"""
         await self._ensure_http_client()
-        for server_name, connection in self.connections.items():
-            if connection.is_connected():
-                try:
-                    await self._health_check_server(server_name)
-                    connection.last_ping = datetime.utcnow()
-                except Exception as e:
-                    logger.warning(f"Health check failed for {server_name}: {e}")
-                    connection.update_status(ConnectionStatus.ERROR.value, str(e))
+        
+        # Probe all connected servers concurrently
+        server_names = list(self._connected)
+        results = await asyncio.gather(
+            *[self._health_check_server(name, timeout=HEALTH_CHECK_TIMEOUT) for name in server_names],
+            return_exceptions=True
+        )
+        
+        for server_name, result in zip(server_names, results):
+            connection = self.connections[server_name]
+            if isinstance(result, Exception):
+                logger.warning(f"Health check failed for {server_name}: {result}")
+                self._set_status(server_name, ConnectionStatus.ERROR.value, str(result))
+            else:
+                connection.last_ping = int(time.time())
     
-    def get_available_tools(self) -> Dict[str, List[Dict[str, Any]]]:
-        """Get all available tools from all connected servers"""
-        all_tools = {}
+    @property
+    def capabilities_version(self) -> int:
+        """Changes whenever get_available_all() would return something different"""
+        return self._caps_version
+    
+    @property
+    def capability_counts(self) -> Mapping[str, int]:
+        """Total tools/resources/prompts across get_all_capabilities(), memoized per version"""
+        key = self._caps_version
+        if self._counts_memo is not None and self._counts_memo[0] == key:
+            return self._counts_memo[1]
+        
+        counts = {"tools": 0, "resources": 0, "prompts": 0}
+        for caps in self._caps_snapshot.values():
+            for kind in counts:
+                counts[kind] += len(caps.get(kind, []))
+        
+        result = MappingProxyType(counts)
+        self._counts_memo = (key, result)
+        return result
+    
+    def get_available_all(self) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, List[Dict[str, Any]]], Dict[str, List[Dict[str, Any]]]]:
+        """Get (tools, resources, prompts) from all connected servers in a single pass"""
+        key = self._caps_version
+        if self._available_memo is not None and self._available_memo[0] == key:
+            return self._available_memo[1]
+        
+        all_tools, all_resources, all_prompts = {}, {}, {}
         for server_name, capabilities in self.capabilities_cache.items():
-            if self.is_server_connected(server_name):
+            if server_name in self._connected:
                 all_tools[server_name] = capabilities.get("tools", [])
-        return all_tools
+                all_resources[server_name] = capabilities.get("resources", [])
+                all_prompts[server_name] = capabilities.get("prompts", [])
+        
+        result = (all_tools, all_resources, all_prompts)
+        self._available_memo = (key, result)
+        return result
+    
+    def get_available_capabilities_snapshot(self) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+        """Get {"tools", "resources", "prompts"} from all connected servers in one call"""
+        tools, resources, prompts = self.get_available_all()
+        return {"tools": tools, "resources": resources, "prompts": prompts}
+    
+    def get_available_tools(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Get all available tools from all connected servers"""
+        return self.get_available_all()[0]
     
     def get_available_resources(self) -> Dict[str, List[Dict[str, Any]]]:
         """Get all available resources from all connected servers"""
-        all_resources = {}
-        for server_name, capabilities in self.capabilities_cache.items():
-            if self.is_server_connected(server_name):
-                all_resources[server_name] = capabilities.get("resources", [])
-        return all_resources
+        return self.get_available_all()[1]
     
     def get_available_prompts(self) -> Dict[str, List[Dict[str, Any]]]:
         """Get all available prompts from all connected servers"""
-        all_prompts = {}
-        for server_name, capabilities in self.capabilities_cache.items():
-            if self.is_server_connected(server_name):
-                all_prompts[server_name] = capabilities.get("prompts", [])
-        return all_prompts
+        return self.get_available_all()[2]
     
     def find_tool(self, tool_name: str) -> Optional[str]:
         """Find which server provides a specific tool"""
-        for server_name, capabilities in self.capabilities_cache.items():
-            if self.is_server_connected(server_name):
-                tools = capabilities.get("tools", [])
-                for tool in tools:
-                    if tool.get("name") == tool_name:
-                        return server_name
-        return None
+        return self._find_provider(self._tool_index, tool_name)
     
     def find_resource(self, uri: str) -> Optional[str]:
         """Find which server provides a specific resource"""
-        for server_name, capabilities in self.capabilities_cache.items():
-            if self.is_server_connected(server_name):
-                resources = capabilities.get("resources", [])
-                for resource in resources:
-                    if resource.get("uri") == uri:
-                        return server_name
-        return None
+        return self._find_provider(self._resource_index, uri)
     
     def find_prompt(self, prompt_name: str) -> Optional[str]:
         """Find which server provides a specific prompt"""
-        for server_name, capabilities in self.capabilities_cache.items():
-            if self.is_server_connected(server_name):
-                prompts = capabilities.get("prompts", [])
-                for prompt in prompts:
-                    if prompt.get("name") == prompt_name:
-                        return server_name
-        return None
+        return self._find_provider(self._prompt_index, prompt_name)
 
 
 # Global HTTP MCP manager instance
 _http_mcp_manager: Optional[HTTPMCPManager] = None
+_init_task: Optional[asyncio.Future] = None
+
+async def _create_http_mcp_manager() -> HTTPMCPManager:
+    """Construct and initialize a new HTTP MCP manager"""
+    manager = HTTPMCPManager()
+    await manager.initialize()
+    return manager
 
 async def get_http_mcp_manager() -> HTTPMCPManager:
-    """Get the global HTTP MCP manager instance"""
-    global _http_mcp_manager
+    """Get the global HTTP MCP manager instance
+    
+    Concurrent first callers all await the same initialization future, so only
+    one manager is ever constructed and initialized.
+    """
+    global _http_mcp_manager, _init_task
     if _http_mcp_manager is None:
-        _http_mcp_manager = HTTPMCPManager()
-        await _http_mcp_manager.initialize()
-    return _http_mcp_manager
\ No newline at end of file
+        # No await between the check and the assignment, so this can't interleave
+        if _init_task is None:
+            _init_task = asyncio.ensure_future(_create_http_mcp_manager())
+        try:
+            # Shielded so a cancelled caller doesn't cancel everyone else's init
+            manager = await asyncio.shield(_init_task)
+        except Exception:
+            # Allow the next caller to retry initialization
+            _init_task = None
+            raise
+        _http_mcp_manager = manager
+    return _http_mcp_manager
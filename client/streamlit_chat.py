@@ -8,14 +8,20 @@ executes tools and resources based on user requests.
 """
 
 import asyncio
+import dataclasses
+import hashlib
+from collections import Counter, OrderedDict
 import streamlit as st
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional, Set
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
 from datetime import datetime
-import json
+import orjson
 import re
 import traceback
 import sys
+import threading
+import queue
 from pathlib import Path
 
 # Add project root to Python path
@@ -23,33 +29,138 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from client.http_mcp_manager import get_http_mcp_manager
 from client.config import get_config
-from client.utils import logger, sanitize_input, format_mcp_response
+from client.utils import (
+    logger, setup_logging, sanitize_input, format_mcp_response,
+    RetryConfig, retry_with_exponential_backoff
+)
+
+# Number of Gemini replies kept in the process-wide response cache
+RESPONSE_CACHE_SIZE = 256
+
+# Candidates sampled (in one request) and voted on in root_elicitation mode
+ROOT_ELICITATION_CANDIDATES = 3
+
+# Models that rejected a multi-candidate request; root_elicitation asks them
+# for a single candidate straight away
+_single_candidate_models: Set[str] = set()
+
+# Most recent chat messages rendered on each rerun; older ones are behind a toggle
+CHAT_HISTORY_WINDOW = 40
+
+# Upper bound on MCP operations from one plan running at the same time
+MAX_CONCURRENT_OPERATIONS = 10
+
+# Retry rate limiting and transient server errors from Gemini
+GEMINI_RETRY = RetryConfig(
+    max_attempts=3,
+    base_delay=0.5,
+    max_delay=8.0,
+    retryable_exceptions=(
+        TimeoutError,
+        google_exceptions.ResourceExhausted,
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.DeadlineExceeded,
+        google_exceptions.InternalServerError
+    )
+)
+
+# Static instructions, passed once as the Gemini system instruction so they
+# aren't re-sent as part of every prompt
+SYSTEM_INSTRUCTION = """You are an AI assistant that can help users by calling MCP (Model Context Protocol) tools and accessing resources. Each request lists the available MCP capabilities followed by the user's request.
+
+IMPORTANT: You must respond with ONLY a valid JSON object. Do not include any other text, explanations, or markdown formatting.
+
+When a user makes a request, analyze their intent and determine if you need to:
+1. Call MCP tools to perform actions
+2. Read MCP resources to get information
+3. Use MCP prompts for structured responses
+4. Provide a direct response without MCP calls
+
+If you need to use MCP capabilities, respond with ONLY this JSON format:
+{
+    "action": "mcp_call",
+    "operations": [
+        {
+            "type": "tool",
+            "server": "server_name",
+            "name": "tool_name",
+            "arguments": {"key": "value"}
+        }
+    ],
+    "explanation": "Brief explanation of what you're doing"
+}
+
+If you can respond directly without MCP calls, use ONLY this JSON format:
+{
+    "action": "direct_response",
+    "response": "Your direct response here"
+}
+
+Examples:
+- For weather requests: use "personal_assistant" server, "get_weather" tool
+- For task management: use "personal_assistant" server, "add_task" or "remove_task" tools
+- For web search: use "personal_assistant" server, "search_web" tool
+- For note search: use "knowledge_base" server, "search_notes" tool"""
+
+@st.cache_resource
+def get_response_cache() -> "OrderedDict[str, str]":
+    """Process-wide LRU of raw Gemini replies, shared across reruns and sessions"""
+    return OrderedDict()
+
+def response_cache_key(user_input: str, response_mode: str, model_name: str, context: str) -> str:
+    """Key a Gemini reply on everything that shapes it (the context embeds the capabilities)"""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in (model_name, response_mode, context, user_input):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+def _run_event_loop(loop: asyncio.AbstractEventLoop):
+    """Thread target: run the shared event loop until the process exits"""
+    asyncio.set_event_loop(loop)
+    loop.run_forever()
+
+@st.cache_resource
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Process-wide event loop on a daemon thread, shared by all sessions"""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=_run_event_loop, args=(loop,), name="mcp-event-loop", daemon=True).start()
+    return loop
+
+def run_async(coro):
+    """Run a coroutine on the persistent event loop and wait for its result
+    
+    Reusing one loop keeps the MCP manager's loop-bound HTTP connection pool
+    alive across chat turns instead of re-dialling every server each time.
+    """
+    return submit_async(coro).result()
+
+def submit_async(coro):
+    """Schedule a coroutine on the persistent event loop; returns a concurrent Future"""
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop())
 
 def initialize_session_state():
     """Initialize Streamlit session state variables"""
     if "messages" not in st.session_state:
         st.session_state.messages = []
     
-    if "mcp_manager" not in st.session_state:
-        st.session_state.mcp_manager = None
-    
-    if "gemini_model" not in st.session_state:
-        st.session_state.gemini_model = None
-    
     if "response_mode" not in st.session_state:
         st.session_state.response_mode = "deterministic"
 
+@st.cache_resource(show_spinner=False)
+def create_gemini_model():
+    """Configured Gemini model, created once per process (failures are not cached)"""
+    config = get_config()
+    if not config.gemini_api_key:
+        raise ValueError("Gemini API key not configured. Please set GOOGLE_API_KEY in your .env file.")
+    
+    genai.configure(api_key=config.gemini_api_key)
+    return genai.GenerativeModel(config.gemini_model, system_instruction=SYSTEM_INSTRUCTION)
+
 def setup_gemini():
     """Initialize Gemini API client"""
     try:
-        config = get_config()
-        if not config.gemini_api_key:
-            st.error("Gemini API key not configured. Please set GOOGLE_API_KEY in your .env file.")
-            return None
-        
-        genai.configure(api_key=config.gemini_api_key)
-        model = genai.GenerativeModel(config.gemini_model)
-        return model
+        return create_gemini_model()
     except Exception as e:
         st.error(f"Failed to initialize Gemini: {e}")
         return None
@@ -60,64 +171,136 @@ async def setup_mcp_connections():
         mcp_manager = await get_http_mcp_manager()
         return mcp_manager
     except Exception as e:
-        st.error(f"Failed to initialize MCP connections: {e}")
+        # Runs on the event loop thread, so the UI error is shown by the caller
         logger.error(f"MCP initialization error: {e}")
-        return None
+        raise
+
+@st.cache_resource(show_spinner=False)
+def connect_mcp_servers():
+    """Connected MCP manager, created once per process (failures are not cached)"""
+    return run_async(setup_mcp_connections())
 
 def display_chat_messages():
-    """Display chat message history"""
-    for message in st.session_state.messages:
+    """Display chat message history
+    
+    Only the last CHAT_HISTORY_WINDOW messages are rendered unless the user
+    asks for older ones, so each rerun doesn't re-render the whole history.
+    """
+    messages = st.session_state.messages
+    hidden = len(messages) - CHAT_HISTORY_WINDOW
+    if hidden > 0 and not st.toggle(f"Show {hidden} older messages", key="show_older_messages"):
+        messages = messages[hidden:]
+    
+    for message in messages:
         with st.chat_message(message["role"]):
             st.markdown(message["content"])
 
-async def handle_inspect_command(mcp_manager) -> str:
-    """Handle /inspect command to show server capabilities"""
-    try:
-        connections = mcp_manager.get_all_connections()
-        capabilities = mcp_manager.get_all_capabilities()
+@st.cache_data(ttl=30, max_entries=16, show_spinner=False)
+def _render_inspection(connections_fingerprint: tuple, capabilities_version: int, _mcp_manager) -> str:
+    """Build the /inspect report; cached until a connection or the capabilities change
+    
+    connections_fingerprint holds (name, status, transport, last ping, error)
+    per server, so the report is rebuilt whenever any of those differ.
+    """
+    capabilities = _mcp_manager.get_all_capabilities()
+    
+    parts = ["🔍 **MCP Server Inspection**\n\n"]
+    
+    for server_name, status, transport, last_ping, error_message in connections_fingerprint:
+        parts.append(f"## {server_name.title()} Server\n")
+        parts.append(f"**Status:** {status}\n")
+        parts.append(f"**Transport:** {transport}\n")
         
-        result = "🔍 **MCP Server Inspection**\n\n"
+        if last_ping:
+            parts.append(f"**Last Ping:** {last_ping}\n")
         
-        for server_name, connection in connections.items():
-            result += f"## {server_name.title()} Server\n"
-            result += f"**Status:** {connection.connection_status}\n"
-            result += f"**Transport:** {connection.transport_type}\n"
-            
-            if connection.last_ping:
-                result += f"**Last Ping:** {connection.last_ping.strftime('%Y-%m-%d %H:%M:%S')}\n"
-            
-            if connection.error_message:
-                result += f"**Error:** {connection.error_message}\n"
-            
-            server_caps = capabilities.get(server_name, {})
-            
-            # Tools
-            tools = server_caps.get("tools", [])
-            result += f"**Tools ({len(tools)}):**\n"
-            for tool in tools:
-                result += f"- `{tool.get('name', 'Unknown')}`: {tool.get('description', 'No description')}\n"
-            
-            # Resources
-            resources = server_caps.get("resources", [])
-            result += f"**Resources ({len(resources)}):**\n"
-            for resource in resources:
-                result += f"- `{resource.get('uri', 'Unknown')}`: {resource.get('description', 'No description')}\n"
-            
-            # Prompts
-            prompts = server_caps.get("prompts", [])
-            result += f"**Prompts ({len(prompts)}):**\n"
-            for prompt in prompts:
-                result += f"- `{prompt.get('name', 'Unknown')}`: {prompt.get('description', 'No description')}\n"
-            
-            result += "\n"
+        if error_message:
+            parts.append(f"**Error:** {error_message}\n")
+        
+        server_caps = capabilities.get(server_name, {})
         
-        return result
+        # Tools
+        tools = server_caps.get("tools", [])
+        parts.append(f"**Tools ({len(tools)}):**\n")
+        for tool in tools:
+            parts.append(f"- `{tool.get('name', 'Unknown')}`: {tool.get('description', 'No description')}\n")
+        
+        # Resources
+        resources = server_caps.get("resources", [])
+        parts.append(f"**Resources ({len(resources)}):**\n")
+        for resource in resources:
+            parts.append(f"- `{resource.get('uri', 'Unknown')}`: {resource.get('description', 'No description')}\n")
+        
+        # Prompts
+        prompts = server_caps.get("prompts", [])
+        parts.append(f"**Prompts ({len(prompts)}):**\n")
+        for prompt in prompts:
+            parts.append(f"- `{prompt.get('name', 'Unknown')}`: {prompt.get('description', 'No description')}\n")
+        
+        parts.append("\n")
+    
+    return "".join(parts)
+
+async def handle_inspect_command(mcp_manager) -> str:
+    """Handle /inspect command to show server capabilities"""
+    try:
+        fingerprint = tuple(
+            (
+                name, c.connection_status, c.transport_type,
+                c.last_ping_dt.strftime('%Y-%m-%d %H:%M:%S') if c.last_ping else None,
+                c.error_message
+            )
+            for name, c in mcp_manager.get_all_connections().items()
+        )
+        return _render_inspection(fingerprint, mcp_manager.capabilities_version, mcp_manager)
     
     except Exception as e:
         return f"❌ Error inspecting servers: {str(e)}"
 
-async def process_user_message(user_input: str, mcp_manager, gemini_model, response_mode: str) -> str:
-    """Process user message and generate response"""
+# One capitalized word of a place name ("New", "St.", "Louis"); time words such
+# as "Tomorrow" are excluded, so those requests are left to Gemini
+_PLACE_WORD = (
+    r"(?!(?i:today|tonight|tomorrow|now|monday|tuesday|wednesday|thursday|friday|"
+    r"saturday|sunday|weekend|morning|afternoon|evening)\b)"
+    r"[A-Z][A-Za-z-]*(?:\.(?= ))?"
+)
+
+# A place name: capitalized words, optionally joined by lowercase particles
+# ("Rio de Janeiro"). Anything else after the name falls through to Gemini.
+_PLACE_NAME = rf"{_PLACE_WORD}(?: (?:(?:de|del|da|di|du|la|le|am|upon) )?{_PLACE_WORD})*"
+
+# Requests that map 1:1 onto a single MCP operation; matched before asking
+# Gemini, against the sanitized input (so "what's" arrives as "whats")
+_INTENT_ROUTES = [
+    (
+        re.compile(r"^(?:show|list)(?: me)? (?:my |all )?tasks[.!?]*$", re.I),
+        lambda m: {"type": "resource", "server": "personal_assistant", "name": "tasks://list"}
+    ),
+    (
+        re.compile(rf"^(?i:(?:whats?|what is) the )?(?i:weather (?:in|for)) (?P<city>{_PLACE_NAME})[.!?]*$"),
+        lambda m: {"type": "tool", "server": "personal_assistant", "name": "get_weather",
+                   "arguments": {"city": m["city"]}}
+    ),
+]
+
+def route_intent(user_input: str, mcp_manager) -> Optional[Dict[str, Any]]:
+    """Return the MCP operation for a well-known request, or None to ask Gemini"""
+    for pattern, build_operation in _INTENT_ROUTES:
+        match = pattern.match(user_input)
+        if match:
+            operation = build_operation(match)
+            if mcp_manager.is_server_connected(operation["server"]):
+                return operation
+            return None
+    return None
+
+async def process_user_message(user_input: str, mcp_manager, gemini_model, response_mode: str,
+                               on_progress: Optional[Callable[[str], None]] = None) -> str:
+    """Process user message and generate response
+    
+    on_progress, if given, receives Gemini's reply text chunk by chunk as it
+    streams in (called from a worker thread).
+    """
     try:
         # Sanitize input
         user_input = sanitize_input(user_input)
@@ -126,65 +309,32 @@ async def process_user_message(user_input: str, mcp_manager, gemini_model, respo
         if user_input.lower().startswith('/inspect'):
             return await handle_inspect_command(mcp_manager)
         
+        # Well-known requests go straight to their MCP operation
+        operation = route_intent(user_input, mcp_manager)
+        if operation is not None:
+            logger.info(f"Routed request directly to {operation['name']} on {operation['server']}")
+            return (await execute_operation(operation, mcp_manager)).strip()
+        
         # Use Gemini to interpret user intent and generate MCP calls
-        response = await interpret_and_execute(user_input, mcp_manager, gemini_model, response_mode)
+        response = await interpret_and_execute(user_input, mcp_manager, gemini_model, response_mode, on_progress)
         return response
     
     except Exception as e:
         logger.error(f"Error processing user message: {e}")
         return f"❌ Error processing your request: {str(e)}"
 
-async def interpret_and_execute(user_input: str, mcp_manager, gemini_model, response_mode: str) -> str:
+async def interpret_and_execute(user_input: str, mcp_manager, gemini_model, response_mode: str,
+                                on_progress: Optional[Callable[[str], None]] = None) -> str:
     """Use Gemini to interpret user intent and execute MCP operations"""
     try:
-        # Get available capabilities
-        tools = mcp_manager.get_available_tools()
-        resources = mcp_manager.get_available_resources()
-        prompts = mcp_manager.get_available_prompts()
+        # Create context for Gemini (re-rendered only when capabilities change)
+        context = cached_mcp_context(mcp_manager.capabilities_version, mcp_manager)
         
-        # Create context for Gemini
-        context = create_mcp_context(tools, resources, prompts)
-        
-        # Generate system prompt
-        system_prompt = f"""You are an AI assistant that can help users by calling MCP (Model Context Protocol) tools and accessing resources.
-
-Available MCP capabilities:
+        # Only the per-turn parts are sent; the static instructions are the
+        # model's system instruction (SYSTEM_INSTRUCTION)
+        system_prompt = f"""Available MCP capabilities:
 {context}
 
-IMPORTANT: You must respond with ONLY a valid JSON object. Do not include any other text, explanations, or markdown formatting.
-
-When a user makes a request, analyze their intent and determine if you need to:
-1. Call MCP tools to perform actions
-2. Read MCP resources to get information
-3. Use MCP prompts for structured responses
-4. Provide a direct response without MCP calls
-
-If you need to use MCP capabilities, respond with ONLY this JSON format:
-{{
-    "action": "mcp_call",
-    "operations": [
-        {{
-            "type": "tool",
-            "server": "server_name",
-            "name": "tool_name",
-            "arguments": {{"key": "value"}}
-        }}
-    ],
-    "explanation": "Brief explanation of what you're doing"
-}}
-
-If you can respond directly without MCP calls, use ONLY this JSON format:
-{{
-    "action": "direct_response",
-    "response": "Your direct response here"
-}}
-
-Examples:
-- For weather requests: use "personal_assistant" server, "get_weather" tool
-- For task management: use "personal_assistant" server, "add_task" or "remove_task" tools
-- For web search: use "personal_assistant" server, "search_web" tool
-- For note search: use "knowledge_base" server, "search_notes" tool
-
 User request: {user_input}
 
 Respond with ONLY valid JSON:"""
@@ -192,15 +342,33 @@ Respond with ONLY valid JSON:"""
         # Configure generation based on response mode
         generation_config = get_generation_config(response_mode)
         
-        # Generate response
-        if response_mode == "root_elicitation":
-            response = await generate_with_root_elicitation(gemini_model, system_prompt, generation_config)
+        # Reuse an earlier reply to the same request; sampled modes only when enabled
+        config = get_config()
+        cache = get_response_cache()
+        cache_key = None
+        if response_mode == "deterministic" or config.cache_sampled_responses:
+            cache_key = response_cache_key(user_input, response_mode, config.gemini_model, context)
+        response = cache.get(cache_key) if cache_key else None
+        
+        if response is not None:
+            cache.move_to_end(cache_key)
+            logger.info("Using cached Gemini response")
         else:
-            response = gemini_model.generate_content(
-                system_prompt,
-                generation_config=generation_config
-            )
-            response = response.text
+            # Reopen idle server connections while Gemini is thinking
+            mcp_manager.schedule_warm_up()
+            
+            # Generate response
+            if response_mode == "root_elicitation":
+                response = await generate_with_root_elicitation(gemini_model, system_prompt, generation_config)
+            else:
+                response = await asyncio.to_thread(
+                    generate_streamed, gemini_model, system_prompt, generation_config, on_progress
+                )
+            
+            if cache_key:
+                cache[cache_key] = response
+                while len(cache) > RESPONSE_CACHE_SIZE:
+                    cache.popitem(last=False)
         
         # Parse and execute the response
         return await execute_gemini_response(response, mcp_manager)
@@ -211,119 +379,215 @@ Respond with ONLY valid JSON:"""
 
 def create_mcp_context(tools: Dict, resources: Dict, prompts: Dict) -> str:
     """Create context string describing available MCP capabilities"""
-    context = ""
+    parts = []
     
     for server_name, server_tools in tools.items():
         if server_tools:
-            context += f"\n{server_name} Tools:\n"
+            parts.append(f"\n{server_name} Tools:\n")
             for tool in server_tools:
-                context += f"- {tool.get('name')}: {tool.get('description', 'No description')}\n"
+                parts.append(f"- {tool.get('name')}: {tool.get('description', 'No description')}\n")
     
     for server_name, server_resources in resources.items():
         if server_resources:
-            context += f"\n{server_name} Resources:\n"
+            parts.append(f"\n{server_name} Resources:\n")
             for resource in server_resources:
-                context += f"- {resource.get('uri')}: {resource.get('description', 'No description')}\n"
+                parts.append(f"- {resource.get('uri')}: {resource.get('description', 'No description')}\n")
     
     for server_name, server_prompts in prompts.items():
         if server_prompts:
-            context += f"\n{server_name} Prompts:\n"
+            parts.append(f"\n{server_name} Prompts:\n")
             for prompt in server_prompts:
-                context += f"- {prompt.get('name')}: {prompt.get('description', 'No description')}\n"
+                parts.append(f"- {prompt.get('name')}: {prompt.get('description', 'No description')}\n")
     
-    return context
+    return "".join(parts)
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def cached_mcp_context(capabilities_version: int, _mcp_manager) -> str:
+    """create_mcp_context for the manager's current capabilities, keyed on their version"""
+    snapshot = _mcp_manager.get_available_capabilities_snapshot()
+    return create_mcp_context(snapshot["tools"], snapshot["resources"], snapshot["prompts"])
 
 def get_generation_config(response_mode: str):
-    """Get Gemini generation configuration based on response mode"""
+    """Get Gemini generation configuration based on response mode
+    
+    All modes use JSON mode so replies parse directly. No response_schema is
+    set: tool arguments are free-form objects, which Gemini's schema subset
+    can't express.
+    """
     if response_mode == "deterministic":
         return genai.types.GenerationConfig(
             temperature=0.0,
             top_p=1.0,
             top_k=1,
-            max_output_tokens=2048
+            max_output_tokens=2048,
+            response_mime_type="application/json"
         )
     elif response_mode == "sampling":
         return genai.types.GenerationConfig(
             temperature=0.9,
             top_p=0.95,
             top_k=40,
-            max_output_tokens=2048
+            max_output_tokens=2048,
+            response_mime_type="application/json"
         )
     else:  # root_elicitation
         return genai.types.GenerationConfig(
+            candidate_count=ROOT_ELICITATION_CANDIDATES,
             temperature=0.7,
             top_p=0.9,
             top_k=20,
-            max_output_tokens=2048
+            max_output_tokens=2048,
+            response_mime_type="application/json"
         )
 
-async def generate_with_root_elicitation(gemini_model, prompt: str, generation_config) -> str:
-    """Generate multiple responses and pick the best one"""
+@retry_with_exponential_backoff(GEMINI_RETRY)
+def gemini_generate(gemini_model, prompt: str, generation_config):
+    """generate_content with retries on rate limiting and transient server errors"""
+    return gemini_model.generate_content(prompt, generation_config=generation_config)
+
+class StreamInterruptedError(RuntimeError):
+    """A Gemini stream failed after part of the reply was already reported
+    
+    Not retried: a new attempt would report the same chunks again.
+    """
+
+@retry_with_exponential_backoff(GEMINI_RETRY)
+def generate_streamed(gemini_model, prompt: str, generation_config,
+                      on_progress: Optional[Callable[[str], None]] = None) -> str:
+    """Stream a single-candidate reply, reporting each chunk, and return the full text
+    
+    Failures before the first chunk are retried; later ones raise
+    StreamInterruptedError.
+    """
+    chunks = []
     try:
-        # Generate multiple responses
-        responses = []
-        for _ in range(3):
-            response = gemini_model.generate_content(
-                prompt,
-                generation_config=generation_config
-            )
-            responses.append(response.text)
-        
-        # Use Gemini to pick the best response
-        selection_prompt = f"""Given these three responses to a user query, select the best one based on accuracy, helpfulness, and clarity:
+        for chunk in gemini_model.generate_content(prompt, generation_config=generation_config, stream=True):
+            text = chunk.text
+            chunks.append(text)
+            if on_progress is not None:
+                on_progress(text)
+    except Exception as e:
+        if chunks:
+            raise StreamInterruptedError(f"Gemini reply was interrupted: {e}") from e
+        raise
+    return "".join(chunks)
 
-Response 1:
-{responses[0]}
+# Leading ```/```json and trailing ``` fence around the whole reply
+_FENCE_RE = re.compile(r'\A\s*```(?:json)?|```\s*\Z')
 
-Response 2:
-{responses[1]}
+def parse_json_reply(response_text: str) -> Any:
+    """Parse a Gemini reply as JSON
+    
+    JSON mode replies are bare JSON, so they parse on the first try; a model
+    or configuration without JSON mode may still wrap the reply in markdown
+    code fences, which are stripped before a second attempt.
+    """
+    try:
+        return orjson.loads(response_text)
+    except orjson.JSONDecodeError:
+        cleaned = _FENCE_RE.sub('', response_text).strip()
+        if cleaned == response_text:
+            raise
+        return orjson.loads(cleaned)
 
-Response 3:
-{responses[2]}
+def select_majority_candidate(candidates: List[str]) -> str:
+    """Pick the plan most candidates agree on (self-consistency voting)
+    
+    Candidates are compared on action + operations (or the direct response);
+    with no majority the first parseable candidate wins.
+    """
+    votes = Counter()
+    first_by_plan = {}
+    for candidate in candidates:
+        try:
+            data = parse_json_reply(candidate)
+        except orjson.JSONDecodeError:
+            continue
+        if not isinstance(data, dict):
+            continue
+        plan = orjson.dumps(
+            [data.get("action"), data.get("operations"), data.get("response")],
+            option=orjson.OPT_SORT_KEYS
+        )
+        votes[plan] += 1
+        first_by_plan.setdefault(plan, candidate)
+    
+    if not votes:
+        return candidates[0]
+    plan, count = votes.most_common(1)[0]
+    if count > 1:
+        return first_by_plan[plan]
+    return next(iter(first_by_plan.values()))
 
-Respond with just the number (1, 2, or 3) of the best response."""
+async def generate_with_root_elicitation(gemini_model, prompt: str, generation_config) -> str:
+    """Sample several candidates in one request and return the majority plan"""
+    model_name = getattr(gemini_model, "model_name", "")
+    if model_name not in _single_candidate_models:
+        try:
+            # generation_config asks for ROOT_ELICITATION_CANDIDATES candidates, so a
+            # single round-trip returns all drafts
+            response = await asyncio.to_thread(gemini_generate, gemini_model, prompt, generation_config)
+            candidates = [
+                "".join(getattr(part, "text", "") for part in candidate.content.parts)
+                for candidate in response.candidates
+            ]
+            candidates = [candidate for candidate in candidates if candidate]
+            if not candidates:
+                raise ValueError("Gemini returned no candidates")
+            return select_majority_candidate(candidates)
         
-        selection = gemini_model.generate_content(
-            selection_prompt,
-            generation_config=genai.types.GenerationConfig(temperature=0.0)
-        )
+        except Exception as e:
+            logger.error(f"Error in root elicitation: {e}")
+            if isinstance(e, google_exceptions.InvalidArgument):
+                # e.g. a Gemini 1.0 model, which only accepts candidate_count=1;
+                # later requests skip the doomed multi-candidate call
+                _single_candidate_models.add(model_name)
+    
+    # Fallback to single response
+    single_config = dataclasses.replace(generation_config, candidate_count=1)
+    response = await asyncio.to_thread(gemini_generate, gemini_model, prompt, single_config)
+    return response.text
+
+async def execute_operation(operation: Dict[str, Any], mcp_manager) -> str:
+    """Run one planned MCP operation and format its result (errors included)"""
+    op_type = operation.get("type")
+    server = operation.get("server")
+    name = operation.get("name")
+    arguments = operation.get("arguments", {})
+    
+    try:
+        if op_type == "tool":
+            logger.info(f"Calling tool {name} on server {server} with args {arguments}")
+            tool_result = await mcp_manager.call_tool(server, name, arguments)
+            # tool_result is already a formatted string from the HTTP API
+            return f"**{name} result:**\n{tool_result}\n\n"
         
-        # Parse selection
-        selection_text = selection.text.strip()
-        if "1" in selection_text:
-            return responses[0]
-        elif "2" in selection_text:
-            return responses[1]
-        elif "3" in selection_text:
-            return responses[2]
-        else:
-            return responses[0]  # Default to first response
+        elif op_type == "resource":
+            logger.info(f"Reading resource {name} from server {server}")
+            resource_result = await mcp_manager.read_resource(server, name)
+            # resource_result is already a formatted string from the HTTP API
+            return f"**{name} resource:**\n{resource_result}\n\n"
+        
+        elif op_type == "prompt":
+            logger.info(f"Getting prompt {name} from server {server} with args {arguments}")
+            prompt_result = await mcp_manager.get_prompt(server, name, arguments)
+            # prompt_result is already a formatted string from the HTTP API
+            return f"**{name} prompt:**\n{prompt_result}\n\n"
+        
+        return ""
     
     except Exception as e:
-        logger.error(f"Error in root elicitation: {e}")
-        # Fallback to single response
-        response = gemini_model.generate_content(prompt, generation_config=generation_config)
-        return response.text
+        logger.error(f"Error executing {op_type} {name}: {e}")
+        return f"❌ Error executing {op_type} {name}: {str(e)}\n\n"
 
 async def execute_gemini_response(response_text: str, mcp_manager) -> str:
     """Parse and execute Gemini's response"""
     try:
-        # Clean up the response text - remove markdown code blocks if present
-        cleaned_response = response_text.strip()
-        if cleaned_response.startswith("```json"):
-            cleaned_response = cleaned_response[7:]
-        if cleaned_response.startswith("```"):
-            cleaned_response = cleaned_response[3:]
-        if cleaned_response.endswith("```"):
-            cleaned_response = cleaned_response[:-3]
-        cleaned_response = cleaned_response.strip()
-        
-        # Try to parse as JSON
         try:
-            response_data = json.loads(cleaned_response)
-        except json.JSONDecodeError as e:
+            response_data = parse_json_reply(response_text)
+        except orjson.JSONDecodeError as e:
             # Log the parsing error and return the raw response
-            logger.error(f"JSON parsing failed for response: {cleaned_response[:200]}... Error: {e}")
+            logger.error(f"JSON parsing failed for response: {response_text[:200]}... Error: {e}")
             return f"🤖 I generated a plan but couldn't execute it properly. Here's what I was trying to do:\n\n{response_text}"
         
         action = response_data.get("action")
@@ -337,34 +601,23 @@ async def execute_gemini_response(response_text: str, mcp_manager) -> str:
             
             result = f"🤖 {explanation}\n\n" if explanation else ""
             
-            for operation in operations:
-                op_type = operation.get("type")
-                server = operation.get("server")
-                name = operation.get("name")
-                arguments = operation.get("arguments", {})
-                
-                try:
-                    if op_type == "tool":
-                        logger.info(f"Calling tool {name} on server {server} with args {arguments}")
-                        tool_result = await mcp_manager.call_tool(server, name, arguments)
-                        # tool_result is already a formatted string from the HTTP API
-                        result += f"**{name} result:**\n{tool_result}\n\n"
-                    
-                    elif op_type == "resource":
-                        logger.info(f"Reading resource {name} from server {server}")
-                        resource_result = await mcp_manager.read_resource(server, name)
-                        # resource_result is already a formatted string from the HTTP API
-                        result += f"**{name} resource:**\n{resource_result}\n\n"
-                    
-                    elif op_type == "prompt":
-                        logger.info(f"Getting prompt {name} from server {server} with args {arguments}")
-                        prompt_result = await mcp_manager.get_prompt(server, name, arguments)
-                        # prompt_result is already a formatted string from the HTTP API
-                        result += f"**{name} prompt:**\n{prompt_result}\n\n"
-                
-                except Exception as e:
-                    logger.error(f"Error executing {op_type} {name}: {e}")
-                    result += f"❌ Error executing {op_type} {name}: {str(e)}\n\n"
+            # Operations on different servers run concurrently; those on the same
+            # server keep the plan's order, since later steps may depend on earlier
+            # ones (e.g. add a task, then list tasks)
+            outputs = [""] * len(operations)
+            by_server: Dict[Any, List[int]] = {}
+            for index, operation in enumerate(operations):
+                by_server.setdefault(operation.get("server"), []).append(index)
+            
+            semaphore = asyncio.Semaphore(MAX_CONCURRENT_OPERATIONS)
+            
+            async def run_server_operations(indexes: List[int]):
+                for index in indexes:
+                    async with semaphore:
+                        outputs[index] = await execute_operation(operations[index], mcp_manager)
+            
+            await asyncio.gather(*(run_server_operations(indexes) for indexes in by_server.values()))
+            result += "".join(outputs)
             
             return result.strip()
         
@@ -375,8 +628,82 @@ async def execute_gemini_response(response_text: str, mcp_manager) -> str:
         logger.error(f"Error executing Gemini response: {e}")
         return f"❌ Error executing response: {str(e)}\n\nRaw response: {response_text}"
 
+@st.fragment
+def capabilities_fragment():
+    """Sidebar capability totals with the Refresh button; reruns on its own"""
+    st.header("Available Capabilities")
+    if st.button("Refresh Capabilities"):
+        if st.session_state.mcp_manager:
+            with st.spinner("Refreshing capabilities..."):
+                run_async(st.session_state.mcp_manager.refresh_capabilities(force=True))
+            st.success("Capabilities refreshed!")
+    
+    # Show capabilities summary
+    if st.session_state.mcp_manager:
+        counts = st.session_state.mcp_manager.capability_counts
+        
+        st.write(f"**Total Available:**")
+        st.write(f"- Tools: {counts['tools']}")
+        st.write(f"- Resources: {counts['resources']}")
+        st.write(f"- Prompts: {counts['prompts']}")
+
+@st.fragment
+def chat_fragment():
+    """Chat history, input and the assistant's reply; reruns on its own"""
+    display_chat_messages()
+    
+    # Chat input
+    if prompt := st.chat_input("What can I help you with?"):
+        # Add user message to chat history
+        st.session_state.messages.append({"role": "user", "content": prompt})
+        
+        # Display user message
+        with st.chat_message("user"):
+            st.markdown(prompt)
+        
+        # Process and display assistant response
+        with st.chat_message("assistant"):
+            with st.spinner("Thinking..."):
+                try:
+                    # Show Gemini's plan as it streams in, then replace it with the result
+                    chunks = queue.Queue()
+                    future = submit_async(process_user_message(
+                        prompt,
+                        st.session_state.mcp_manager,
+                        st.session_state.gemini_model,
+                        st.session_state.response_mode,
+                        on_progress=chunks.put
+                    ))
+                    placeholder = st.empty()
+                    streamed = []
+                    while True:
+                        try:
+                            streamed.append(chunks.get(timeout=0.05))
+                        except queue.Empty:
+                            if future.done():
+                                break
+                            continue
+                        placeholder.code("".join(streamed), language="json")
+                    response = future.result()
+                    placeholder.markdown(response)
+                except Exception as e:
+                    error_msg = f"❌ Error processing request: {str(e)}"
+                    st.markdown(error_msg)
+                    response = error_msg
+        
+        # Add assistant response to chat history
+        st.session_state.messages.append({"role": "assistant", "content": response})
+
 def main():
     """Main Streamlit application"""
+    # Configure logging once per process; later reruns are a no-op. get_config()
+    # loads .env first; a broken config is reported once initialization runs
+    try:
+        log_level = get_config().log_level
+    except Exception:
+        log_level = "INFO"
+    setup_logging(log_level)
+    
     st.set_page_config(
         page_title="MCP Learning System",
         page_icon="🤖",
@@ -389,13 +716,15 @@ def main():
     # Initialize session state
     initialize_session_state()
     
-    # Initialize components
-    if st.session_state.gemini_model is None:
-        st.session_state.gemini_model = setup_gemini()
+    # Initialize components (cached per process, so reruns reuse them)
+    st.session_state.gemini_model = setup_gemini()
     
-    if st.session_state.mcp_manager is None:
-        with st.spinner("Connecting to MCP servers..."):
-            st.session_state.mcp_manager = asyncio.run(setup_mcp_connections())
+    with st.spinner("Connecting to MCP servers..."):
+        try:
+            st.session_state.mcp_manager = connect_mcp_servers()
+        except Exception as e:
+            st.session_state.mcp_manager = None
+            st.error(f"Failed to initialize MCP connections: {e}")
     
     # Check if initialization was successful
     if st.session_state.gemini_model is None or st.session_state.mcp_manager is None:
@@ -427,25 +756,8 @@ def main():
                 if connection.error_message:
                     st.write(f"   Error: {connection.error_message}")
         
-        # Capabilities
-        st.header("Available Capabilities")
-        if st.button("Refresh Capabilities"):
-            if st.session_state.mcp_manager:
-                with st.spinner("Refreshing capabilities..."):
-                    asyncio.run(st.session_state.mcp_manager.refresh_capabilities())
-                st.success("Capabilities refreshed!")
-        
-        # Show capabilities summary
-        if st.session_state.mcp_manager:
-            capabilities = st.session_state.mcp_manager.get_all_capabilities()
-            total_tools = sum(len(caps.get("tools", [])) for caps in capabilities.values())
-            total_resources = sum(len(caps.get("resources", [])) for caps in capabilities.values())
-            total_prompts = sum(len(caps.get("prompts", [])) for caps in capabilities.values())
-            
-            st.write(f"**Total Available:**")
-            st.write(f"- Tools: {total_tools}")
-            st.write(f"- Resources: {total_resources}")
-            st.write(f"- Prompts: {total_prompts}")
+        # Capabilities (a fragment, so Refresh doesn't rerun the whole page)
+        capabilities_fragment()
         
         # Help section
         st.header("Commands")
@@ -459,36 +771,8 @@ def main():
         st.write("- 'Search for Python best practices'")
         st.write("- 'Show me my tasks'")
     
-    # Main chat interface
-    display_chat_messages()
-    
-    # Chat input
-    if prompt := st.chat_input("What can I help you with?"):
-        # Add user message to chat history
-        st.session_state.messages.append({"role": "user", "content": prompt})
-        
-        # Display user message
-        with st.chat_message("user"):
-            st.markdown(prompt)
-        
-        # Process and display assistant response
-        with st.chat_message("assistant"):
-            with st.spinner("Thinking..."):
-                try:
-                    response = asyncio.run(process_user_message(
-                        prompt,
-                        st.session_state.mcp_manager,
-                        st.session_state.gemini_model,
-                        st.session_state.response_mode
-                    ))
-                    st.markdown(response)
-                except Exception as e:
-                    error_msg = f"❌ Error processing request: {str(e)}"
-                    st.markdown(error_msg)
-                    response = error_msg
-        
-        # Add assistant response to chat history
-        st.session_state.messages.append({"role": "assistant", "content": response})
+    # Main chat interface (a fragment, so a new message doesn't rerun the sidebar)
+    chat_fragment()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
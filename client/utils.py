@@ -9,26 +9,52 @@ import logging
 import time
 import json
 import os
-from typing import Any, Callable, Optional, TypeVar, Dict, List
+import re
+import sys
+from typing import TYPE_CHECKING, Any, Callable, FrozenSet, Literal, Optional, Set, Tuple, TypeVar, Dict, List
 from functools import wraps
+from enum import IntEnum
 import random
-import httpx
+import threading
+from collections import Counter, deque
+import orjson
 from pathlib import Path
 
+if TYPE_CHECKING:
+    import httpx
+
 # Type variable for generic functions
 T = TypeVar('T')
 
+# Module logger; handlers are installed by the application via setup_logging()
+logger = logging.getLogger(__name__)
+
 def setup_logging(log_level: str = "INFO") -> logging.Logger:
-    """Set up logging configuration"""
+    """Set up logging configuration (once per process)"""
+    if logging.getLogger().hasHandlers():
+        return logger
+    level = getattr(logging, log_level.upper(), None)
+    if not isinstance(level, int):
+        # An unknown LOG_LEVEL shouldn't stop the client from starting
+        level = logging.INFO
     logging.basicConfig(
-        level=getattr(logging, log_level.upper()),
+        level=level,
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
         handlers=[
             logging.StreamHandler(),
-            logging.FileHandler('mcp_client.log')
+            # Opened on first write, not at configuration time
+            logging.FileHandler('mcp_client.log', delay=True)
         ]
     )
-    return logging.getLogger(__name__)
+    return logger
+
+def _loaded_httpx():
+    """The httpx module if something has already imported it, else None
+    
+    An error can only be an httpx error once httpx is loaded, so the retry
+    helpers check for it without importing it themselves.
+    """
+    return sys.modules.get("httpx")
 
 class RetryConfig:
     """Configuration for retry logic"""
@@ -38,56 +64,133 @@ class RetryConfig:
         base_delay: float = 1.0,
         max_delay: float = 30.0,
         exponential_base: float = 2.0,
-        jitter: bool = True
+        jitter: bool = True,
+        jitter_mode: Literal["full", "equal", "decorrelated"] = "decorrelated",
+        # None means httpx transport errors and timeouts
+        retryable_exceptions: Optional[Tuple[type, ...]] = None,
+        retryable_statuses: FrozenSet[int] = frozenset({408, 425, 429, 500, 502, 503, 504})
     ):
         self.max_attempts = max_attempts
         self.base_delay = base_delay
         self.max_delay = max_delay
         self.exponential_base = exponential_base
         self.jitter = jitter
+        self.jitter_mode = jitter_mode
+        self.retryable_exceptions = retryable_exceptions
+        self.retryable_statuses = retryable_statuses
+        
+        # Capped exponential delay per attempt, computed once
+        self._schedule = tuple(
+            min(base_delay * (exponential_base ** i), max_delay)
+            for i in range(max_attempts)
+        )
+    
+    def is_retryable(self, error: Exception) -> bool:
+        """Whether an error is transient and worth another attempt"""
+        httpx = _loaded_httpx()
+        if httpx is not None and isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code in self.retryable_statuses
+        
+        exceptions = self.retryable_exceptions
+        if exceptions is None:
+            if httpx is None:
+                return False
+            exceptions = (httpx.TransportError, httpx.TimeoutException)
+        return isinstance(error, exceptions)
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    """Delay requested by the server via a Retry-After header, if any"""
+    httpx = _loaded_httpx()
+    if httpx is None or not isinstance(error, httpx.HTTPStatusError):
+        return None
+    value = error.response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        from email.utils import parsedate_to_datetime
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def _next_retry_delay(config: RetryConfig, attempt: int, prev_delay: float, error: Exception) -> float:
+    """Delay before the next attempt, honouring the server's Retry-After first"""
+    retry_after = _retry_after_seconds(error)
+    if retry_after is not None:
+        return min(retry_after, config.max_delay)
+    
+    # Exponential backoff, precomputed per attempt
+    delay = config._schedule[attempt]
+    
+    # Add jitter to prevent thundering herd
+    if config.jitter:
+        if config.jitter_mode == "full":
+            delay = random.uniform(0, delay)
+        elif config.jitter_mode == "equal":
+            delay *= (0.5 + random.random() * 0.5)
+        else:
+            # Decorrelated: grow from the previous delay, not the attempt number
+            delay = min(config.max_delay, random.uniform(config.base_delay, prev_delay * 3))
+    return delay
 
 def retry_with_exponential_backoff(config: RetryConfig):
-    """Decorator for retry logic with exponential backoff"""
+    """Decorator for retry logic with exponential backoff
+    
+    Works on both coroutine functions and plain functions; the matching
+    wrapper is chosen once, at decoration time.
+    """
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
-        @wraps(func)
-        async def wrapper(*args, **kwargs) -> T:
-            last_exception = None
-            
-            for attempt in range(config.max_attempts):
-                try:
-                    if asyncio.iscoroutinefunction(func):
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def wrapper(*args, **kwargs) -> T:
+                prev_delay = config.base_delay
+                
+                for attempt in range(config.max_attempts):
+                    try:
                         return await func(*args, **kwargs)
-                    else:
+                    except Exception as e:
+                        # Permanent failures (e.g. 4xx other than 429) are not retried
+                        if not config.is_retryable(e) or attempt == config.max_attempts - 1:
+                            raise
+                        
+                        delay = prev_delay = _next_retry_delay(config, attempt, prev_delay, e)
+                        logging.warning(
+                            f"Attempt {attempt + 1} failed: {e}. "
+                            f"Retrying in {delay:.2f} seconds..."
+                        )
+                        await asyncio.sleep(delay)
+        else:
+            @wraps(func)
+            def wrapper(*args, **kwargs) -> T:
+                prev_delay = config.base_delay
+                
+                for attempt in range(config.max_attempts):
+                    try:
                         return func(*args, **kwargs)
-                except Exception as e:
-                    last_exception = e
-                    
-                    if attempt == config.max_attempts - 1:
-                        break
-                    
-                    # Calculate delay with exponential backoff
-                    delay = min(
-                        config.base_delay * (config.exponential_base ** attempt),
-                        config.max_delay
-                    )
-                    
-                    # Add jitter to prevent thundering herd
-                    if config.jitter:
-                        delay *= (0.5 + random.random() * 0.5)
-                    
-                    logging.warning(
-                        f"Attempt {attempt + 1} failed: {e}. "
-                        f"Retrying in {delay:.2f} seconds..."
-                    )
-                    
-                    await asyncio.sleep(delay)
-            
-            # If we get here, all attempts failed
-            raise last_exception
+                    except Exception as e:
+                        # Permanent failures (e.g. 4xx other than 429) are not retried
+                        if not config.is_retryable(e) or attempt == config.max_attempts - 1:
+                            raise
+                        
+                        delay = prev_delay = _next_retry_delay(config, attempt, prev_delay, e)
+                        logging.warning(
+                            f"Attempt {attempt + 1} failed: {e}. "
+                            f"Retrying in {delay:.2f} seconds..."
+                        )
+                        time.sleep(delay)
         
         return wrapper
     return decorator
 
+class CircuitState(IntEnum):
+    """Circuit breaker states (ints, so state checks are integer compares)"""
+    CLOSED = 0
+    OPEN = 1
+    HALF_OPEN = 2
+
 class CircuitBreaker:
     """Circuit breaker pattern implementation"""
     def __init__(
@@ -101,52 +204,92 @@ class CircuitBreaker:
         self.expected_exception = expected_exception
         
         self.failure_count = 0
+        # time.monotonic() of the last failure (opaque, not epoch seconds)
         self.last_failure_time = None
-        self.state = "CLOSED"  # CLOSED, OPEN, HALF_OPEN
+        self.state = CircuitState.CLOSED
+        
+        # Guards state transitions; never held across an await
+        self._lock = threading.Lock()
+        # Owner of the single call admitted while HALF_OPEN, if one is in flight
+        self._probe_owner = None
     
     def __call__(self, func: Callable[..., T]) -> Callable[..., T]:
-        @wraps(func)
-        async def wrapper(*args, **kwargs) -> T:
-            if self.state == "OPEN":
-                if self._should_attempt_reset():
-                    self.state = "HALF_OPEN"
-                else:
-                    raise Exception("Circuit breaker is OPEN")
-            
-            try:
-                if asyncio.iscoroutinefunction(func):
-                    result = await func(*args, **kwargs)
-                else:
+        # Sync functions get a sync wrapper so callers don't have to await them
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def wrapper(*args, **kwargs) -> T:
+                async with self:
+                    return await func(*args, **kwargs)
+        else:
+            @wraps(func)
+            def wrapper(*args, **kwargs) -> T:
+                owner = object()
+                self._before_call(owner)
+                try:
                     result = func(*args, **kwargs)
-                
-                self._on_success()
+                except BaseException as e:
+                    self._after_call(type(e), owner)
+                    raise
+                self._after_call(None, owner)
                 return result
-                
-            except self.expected_exception as e:
-                self._on_failure()
-                raise e
         
         return wrapper
     
+    async def __aenter__(self):
+        """Admit a call, or fail fast while the circuit is open"""
+        self._before_call(asyncio.current_task())
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Record the outcome of the guarded call"""
+        self._after_call(exc_type, asyncio.current_task())
+        return False
+    
+    def _before_call(self, owner: Any):
+        """Admit a call, moving OPEN -> HALF_OPEN once the recovery timeout has passed
+        
+        While HALF_OPEN only one probe call is let through; everyone else
+        fails fast until it reports back.
+        """
+        with self._lock:
+            if self.state == CircuitState.OPEN:
+                if not self._should_attempt_reset():
+                    raise Exception("Circuit breaker is OPEN")
+                self.state = CircuitState.HALF_OPEN
+            if self.state == CircuitState.HALF_OPEN:
+                if self._probe_owner is not None:
+                    raise Exception("Circuit breaker is HALF_OPEN (probe in flight)")
+                self._probe_owner = owner
+    
+    def _after_call(self, exc_type: Optional[type], owner: Any):
+        """Record a call's outcome"""
+        with self._lock:
+            if self._probe_owner is owner:
+                self._probe_owner = None
+            if exc_type is None:
+                self._on_success()
+            elif issubclass(exc_type, self.expected_exception):
+                self._on_failure()
+    
     def _should_attempt_reset(self) -> bool:
         """Check if enough time has passed to attempt reset"""
         return (
             self.last_failure_time is not None and
-            time.time() - self.last_failure_time >= self.recovery_timeout
+            time.monotonic() - self.last_failure_time >= self.recovery_timeout
         )
     
     def _on_success(self):
-        """Handle successful execution"""
+        """Handle successful execution (caller holds the lock)"""
         self.failure_count = 0
-        self.state = "CLOSED"
+        self.state = CircuitState.CLOSED
     
     def _on_failure(self):
-        """Handle failed execution"""
+        """Handle failed execution (caller holds the lock)"""
         self.failure_count += 1
-        self.last_failure_time = time.time()
+        self.last_failure_time = time.monotonic()
         
         if self.failure_count >= self.failure_threshold:
-            self.state = "OPEN"
+            self.state = CircuitState.OPEN
 
 def format_error_message(error: Exception, context: str = "") -> str:
     """Format error message for user display"""
@@ -158,28 +301,20 @@ def format_error_message(error: Exception, context: str = "") -> str:
     else:
         return f"{error_type}: {error_message}"
 
+# Potentially dangerous characters removed by sanitize_input
+_SANITIZE_TABLE = str.maketrans("", "", "<>\"'&\x00\r")
+
 def sanitize_input(input_text: str, max_length: int = 1000) -> str:
-    """Sanitize user input for safety"""
+    """Sanitize user input for safety (Unicode in, Unicode out)"""
     if not isinstance(input_text, str):
         input_text = str(input_text)
     
-    # Remove potentially dangerous characters
-    dangerous_chars = ['<', '>', '"', "'", '&', '\x00', '\r']
-    sanitized = input_text
-    for char in dangerous_chars:
-        sanitized = sanitized.replace(char, '')
-    
-    # Limit length and strip whitespace
-    sanitized = sanitized.strip()[:max_length]
-    
-    # Validate encoding (ensure it's valid UTF-8)
-    try:
-        sanitized.encode('utf-8')
-    except UnicodeEncodeError:
-        # If encoding fails, keep only ASCII characters
-        sanitized = ''.join(char for char in sanitized if ord(char) < 128)
-    
-    return sanitized
+    # Remove potentially dangerous characters (single pass), then strip and limit length
+    return input_text.translate(_SANITIZE_TABLE).strip()[:max_length]
+
+def _dumps_pretty(obj: Any) -> str:
+    """Indented JSON for display"""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
 
 def format_mcp_response(response: Dict[str, Any]) -> str:
     """Format MCP response for display in chat"""
@@ -194,9 +329,10 @@ def format_mcp_response(response: Dict[str, Any]) -> str:
             formatted_parts = []
             for item in content:
                 if isinstance(item, dict):
-                    if item.get("type") == "text":
+                    item_type = item.get("type")
+                    if item_type == "text":
                         formatted_parts.append(item.get("text", ""))
-                    elif item.get("type") == "image":
+                    elif item_type == "image":
                         formatted_parts.append(f"[Image: {item.get('source', 'unknown')}]")
                     else:
                         formatted_parts.append(str(item))
@@ -220,51 +356,94 @@ def format_mcp_response(response: Dict[str, Any]) -> str:
     if "result" in response:
         result = response["result"]
         if isinstance(result, dict):
-            return json.dumps(result, indent=2)
+            return _dumps_pretty(result)
         else:
             return str(result)
     
     # Default formatting for other response types
     try:
-        return json.dumps(response, indent=2)
+        return _dumps_pretty(response)
     except (TypeError, ValueError):
         return str(response)
 
-class RateLimiter:
-    """Simple rate limiter implementation"""
+class TokenBucket:
+    """Token bucket: refills at rate_per_sec up to capacity, one token per call"""
+    def __init__(self, rate_per_sec: float, capacity: int):
+        self.rate = rate_per_sec
+        self.capacity = capacity
+        # Bucket starts full so an initial burst of capacity calls is admitted
+        self.tokens: float = capacity
+        self.last_refill: float = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        """Acquire permission to make a call"""
+        async with self._lock:
+            now = time.monotonic()
+            
+            # Refill for the time elapsed since the last call, capped at capacity
+            self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+            self.last_refill = now
+            
+            if self.tokens < 1:
+                # Wait for the missing fraction of a token, then spend it
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self.tokens = 0
+                self.last_refill = time.monotonic()
+            else:
+                self.tokens -= 1
+
+class RateLimiter(TokenBucket):
+    """Token bucket rate limiter allowing max_calls per time_window"""
+    def __init__(self, max_calls: int, time_window: float):
+        super().__init__(max_calls / time_window, max_calls)
+        self.max_calls = max_calls
+        self.time_window = time_window
+
+class SlidingWindowRateLimiter:
+    """Strict sliding-window rate limiter (no bursts beyond max_calls per window)"""
     def __init__(self, max_calls: int, time_window: float):
         self.max_calls = max_calls
         self.time_window = time_window
-        self.calls = []
+        # Call timestamps, oldest first
+        self.calls = deque()
+        self._lock = asyncio.Lock()
     
     async def acquire(self):
         """Acquire permission to make a call"""
-        now = time.time()
-        
-        # Remove old calls outside the time window
-        self.calls = [call_time for call_time in self.calls 
-                     if now - call_time < self.time_window]
-        
-        if len(self.calls) >= self.max_calls:
-            # Calculate how long to wait
-            oldest_call = min(self.calls)
-            wait_time = self.time_window - (now - oldest_call)
-            await asyncio.sleep(wait_time)
-        
-        self.calls.append(now)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                
+                # Drop calls that have left the window
+                while self.calls and now - self.calls[0] >= self.time_window:
+                    self.calls.popleft()
+                
+                if len(self.calls) < self.max_calls:
+                    break
+                
+                # Wait until the oldest call expires, then re-check
+                await asyncio.sleep(self.time_window - (now - self.calls[0]))
+            
+            self.calls.append(time.monotonic())
 
 # File I/O utilities
-async def safe_read_json(file_path: str) -> Dict[str, Any]:
-    """Safely read JSON file with error handling"""
+# The blocking work runs in a worker thread so the event loop stays responsive
+
+# Directories safe_write_json has already created or found
+_KNOWN_DIRS: Set[str] = set()
+
+def _read_json_sync(file_path: str) -> Dict[str, Any]:
+    """Blocking body of safe_read_json"""
     try:
-        if not os.path.exists(file_path):
+        # orjson parses the raw bytes directly, no str decode/strip copies
+        with open(file_path, 'rb') as f:
+            content = f.read()
+        if not content.strip():
             return {}
-        
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read().strip()
-            if not content:
-                return {}
-            return json.loads(content)
+        return orjson.loads(content)
+    except FileNotFoundError:
+        return {}
     except json.JSONDecodeError as e:
         logger.error(f"Invalid JSON in {file_path}: {e}")
         return {}
@@ -272,16 +451,19 @@ async def safe_read_json(file_path: str) -> Dict[str, Any]:
         logger.error(f"Error reading {file_path}: {e}")
         return {}
 
-async def safe_write_json(file_path: str, data: Dict[str, Any]) -> bool:
-    """Safely write JSON file with error handling"""
+def _write_json_sync(file_path: str, data: Dict[str, Any]) -> bool:
+    """Blocking body of safe_write_json"""
+    temp_path = file_path + '.tmp'
     try:
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        # Ensure directory exists (once per directory per process)
+        directory = os.path.dirname(file_path)
+        if directory and directory not in _KNOWN_DIRS:
+            os.makedirs(directory, exist_ok=True)
+            _KNOWN_DIRS.add(directory)
         
         # Write to temporary file first
-        temp_path = file_path + '.tmp'
-        with open(temp_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        with open(temp_path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
         
         # Atomic move
         os.replace(temp_path, file_path)
@@ -289,34 +471,83 @@ async def safe_write_json(file_path: str, data: Dict[str, Any]) -> bool:
     except Exception as e:
         logger.error(f"Error writing {file_path}: {e}")
         # Clean up temp file if it exists
-        if os.path.exists(temp_path):
-            try:
-                os.remove(temp_path)
-            except:
-                pass
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
         return False
 
-async def safe_read_text(file_path: str) -> str:
-    """Safely read text file with error handling"""
+def _read_text_sync(file_path: str) -> str:
+    """Blocking body of safe_read_text"""
     try:
-        if not os.path.exists(file_path):
-            return ""
-        
         with open(file_path, 'r', encoding='utf-8') as f:
             return f.read()
+    except FileNotFoundError:
+        return ""
     except Exception as e:
         logger.error(f"Error reading {file_path}: {e}")
         return ""
 
+async def safe_read_json(file_path: str) -> Dict[str, Any]:
+    """Safely read JSON file with error handling"""
+    return await asyncio.to_thread(_read_json_sync, file_path)
+
+async def safe_write_json(file_path: str, data: Dict[str, Any]) -> bool:
+    """Safely write JSON file with error handling"""
+    return await asyncio.to_thread(_write_json_sync, file_path, data)
+
+async def safe_read_text(file_path: str) -> str:
+    """Safely read text file with error handling"""
+    return await asyncio.to_thread(_read_text_sync, file_path)
+
 # API client utilities
 class APIClient:
     """Base API client with rate limiting and error handling"""
     
-    def __init__(self, base_url: str, api_key: str = None, rate_limit: RateLimiter = None):
+    def __init__(self, base_url: str, api_key: str = None, rate_limit: TokenBucket = None):
+        # Imported here so importing this module doesn't pay for httpx
+        import httpx
+        
         self.base_url = base_url.rstrip('/')
         self.api_key = api_key
-        self.rate_limiter = rate_limit or RateLimiter(max_calls=60, time_window=60.0)
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self.rate_limiter = rate_limit or TokenBucket(rate_per_sec=1.0, capacity=60)
+        
+        # Built once; endpoints are joined relative to the base path
+        self._base = httpx.URL(self.base_url + '/')
+        self._base_headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        
+        # Pooled HTTP/2 client; the auth header is set on the client once rather
+        # than merged into every request. Limits/http2 live on the transport
+        # (httpx ignores the client-level ones when a transport is passed).
+        transport = httpx.AsyncHTTPTransport(
+            http2=True,
+            retries=0,  # retries are handled by retry_with_exponential_backoff
+            limits=httpx.Limits(
+                max_connections=50,
+                max_keepalive_connections=50,
+                keepalive_expiry=30.0
+            )
+        )
+        self.client = httpx.AsyncClient(
+            transport=transport,
+            timeout=httpx.Timeout(30.0, connect=5.0, pool=5.0),
+            headers=self._base_headers
+        )
+        
+        # One limiter per host, so a throttled host doesn't hold up the others
+        self._host_limiters: Dict[str, Any] = {self._base.host: self.rate_limiter}
+    
+    def _limiter_for(self, url: "httpx.URL"):
+        """Rate limiter for the request's host, created on first use"""
+        limiter = self._host_limiters.get(url.host)
+        if limiter is None:
+            template = self.rate_limiter
+            if isinstance(template, TokenBucket):
+                limiter = TokenBucket(template.rate, template.capacity)
+            else:
+                limiter = template
+            self._host_limiters[url.host] = limiter
+        return limiter
     
     async def __aenter__(self):
         return self
@@ -327,43 +558,34 @@ class APIClient:
     @retry_with_exponential_backoff(RetryConfig(max_attempts=3))
     async def get(self, endpoint: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
         """Make GET request with retry logic"""
-        await self.rate_limiter.acquire()
-        
-        url = f"{self.base_url}/{endpoint.lstrip('/')}"
-        headers = {}
-        if self.api_key:
-            headers["Authorization"] = f"Bearer {self.api_key}"
+        url = self._base.join(endpoint.lstrip('/'))
+        await self._limiter_for(url).acquire()
         
-        response = await self.client.get(url, params=params, headers=headers)
+        response = await self.client.get(url, params=params)
         response.raise_for_status()
         return response.json()
     
     @retry_with_exponential_backoff(RetryConfig(max_attempts=3))
     async def post(self, endpoint: str, data: Dict[str, Any] = None) -> Dict[str, Any]:
         """Make POST request with retry logic"""
-        await self.rate_limiter.acquire()
+        url = self._base.join(endpoint.lstrip('/'))
+        await self._limiter_for(url).acquire()
         
-        url = f"{self.base_url}/{endpoint.lstrip('/')}"
-        headers = {"Content-Type": "application/json"}
-        if self.api_key:
-            headers["Authorization"] = f"Bearer {self.api_key}"
-        
-        response = await self.client.post(url, json=data, headers=headers)
+        response = await self.client.post(url, json=data)
         response.raise_for_status()
         return response.json()
 
 # Validation utilities
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_URL_RE = re.compile(r'^https?://[^\s/$.?#].[^\s]*$')
+
 def validate_email(email: str) -> bool:
     """Simple email validation"""
-    import re
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    return _EMAIL_RE.match(email) is not None
 
 def validate_url(url: str) -> bool:
     """Simple URL validation"""
-    import re
-    pattern = r'^https?://[^\s/$.?#].[^\s]*$'
-    return re.match(pattern, url) is not None
+    return _URL_RE.match(url) is not None
 
 def validate_date_string(date_str: str) -> bool:
     """Validate ISO date string format"""
@@ -375,26 +597,27 @@ def validate_date_string(date_str: str) -> bool:
         return False
 
 # Text processing utilities
+
+# Common stop words to filter out of keyword extraction
+_STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 
+    'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have',
+    'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should',
+    'this', 'that', 'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we',
+    'they', 'me', 'him', 'her', 'us', 'them'
+})
+
+# Words of at least 3 ASCII letters
+_WORD_RE = re.compile(r'\b[a-zA-Z]{3,}\b')
+
 def extract_keywords(text: str, max_keywords: int = 10) -> List[str]:
     """Extract keywords from text using simple frequency analysis"""
-    import re
-    from collections import Counter
-    
-    # Common stop words to filter out
-    stop_words = {
-        'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 
-        'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have',
-        'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should',
-        'this', 'that', 'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we',
-        'they', 'me', 'him', 'her', 'us', 'them'
-    }
-    
-    # Extract words (alphanumeric only, minimum 3 characters)
-    words = re.findall(r'\b[a-zA-Z]{3,}\b', text.lower())
-    
-    # Filter out stop words and count frequency
-    filtered_words = [word for word in words if word not in stop_words]
-    word_counts = Counter(filtered_words)
+    # Extract words (alphanumeric only, minimum 3 characters), drop stop
+    # words and count in a single pass; only matched words are lowercased
+    word_counts = Counter(
+        word for match in _WORD_RE.finditer(text)
+        if (word := match.group().lower()) not in _STOP_WORDS
+    )
     
     # Return most common words
     return [word for word, count in word_counts.most_common(max_keywords)]
@@ -406,10 +629,10 @@ def truncate_text(text: str, max_length: int = 100, suffix: str = "...") -> str:
     
     # Try to break at word boundary
     truncated = text[:max_length - len(suffix)]
-    last_space = truncated.rfind(' ')
+    head, sep, _ = truncated.rpartition(' ')
     
-    if last_space > max_length * 0.7:  # If we can break at a reasonable point
-        truncated = truncated[:last_space]
+    if sep and len(head) > max_length * 0.7:  # If we can break at a reasonable point
+        return head + suffix
     
     return truncated + suffix
 
@@ -422,14 +645,24 @@ async def run_with_timeout(coro, timeout_seconds: float):
         raise TimeoutError(f"Operation timed out after {timeout_seconds} seconds")
 
 async def gather_with_concurrency(tasks: List, max_concurrency: int = 5):
-    """Run tasks with limited concurrency"""
-    semaphore = asyncio.Semaphore(max_concurrency)
+    """Run tasks with limited concurrency
     
-    async def run_task(task):
-        async with semaphore:
-            return await task
+    tasks are awaitables (normally un-started coroutines) and results are
+    returned in input order. A fixed pool of max_concurrency workers drains
+    them, so memory and scheduler load don't grow with len(tasks).
+    """
+    results = [None] * len(tasks)
+    queue = asyncio.Queue()
+    for item in enumerate(tasks):
+        queue.put_nowait(item)
     
-    return await asyncio.gather(*[run_task(task) for task in tasks])
-
-# Global logger instance
-logger = setup_logging()
\ No newline at end of file
+    async def worker():
+        while True:
+            try:
+                index, task = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            results[index] = await task
+    
+    await asyncio.gather(*(worker() for _ in range(min(max_concurrency, len(tasks)))))
+    return results
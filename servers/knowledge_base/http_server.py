@@ -7,29 +7,45 @@ FastAPI wrapper for the Knowledge Base MCP Server
 import asyncio
 import json
 import logging
-from typing import Any, Dict, List, Optional
-from fastapi import FastAPI, HTTPException
+import os
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional, Tuple
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
+import orjson
 import uvicorn
 
 # Import the original MCP server functions
 from .server import (
-    load_all_notes, search_notes_by_keyword, get_note_by_id,
-    search_notes_tool, summarize_text_tool, get_faq_answer_prompt,
+    search_notes_by_keyword, get_note_by_id, get_notes_json,
+    summarize_text_tool, get_faq_answer_prompt,
     handle_list_resources, handle_read_resource, handle_list_tools,
-    handle_list_prompts
+    handle_list_prompts, TOOL_DISPATCH, start_notes_watcher, stop_notes_watcher
 )
+from shared.http_utils import mcp_json_default, listing_etag, listing_response
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Watch the notes directory for the lifetime of the server"""
+    start_notes_watcher()
+    yield
+    stop_notes_watcher()
+
 # FastAPI app
 app = FastAPI(
     title="Knowledge Base MCP Server",
     description="HTTP API for Knowledge Base MCP functionality",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    # orjson serializes the larger payloads (/notes, /notes/search) much faster
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -41,41 +57,30 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Request/Response models
+# Compress larger payloads for clients that accept gzip; small ones such as
+# /health aren't worth it
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+# Request models (responses are plain dicts, serialized straight to orjson
+# without a validation pass)
 class ToolCallRequest(BaseModel):
     name: str
     arguments: Dict[str, Any]
 
-class ToolCallResponse(BaseModel):
-    success: bool
-    result: str
-    error: Optional[str] = None
-
 class ResourceRequest(BaseModel):
     uri: str
 
-class ResourceResponse(BaseModel):
-    success: bool
-    content: str
-    error: Optional[str] = None
-
 class PromptRequest(BaseModel):
     name: str
     arguments: Dict[str, str] = {}
 
-class PromptResponse(BaseModel):
-    success: bool
-    prompt: str
-    error: Optional[str] = None
-
 class SearchRequest(BaseModel):
     keyword: str
     max_results: int = 5
 
-class SearchResponse(BaseModel):
-    success: bool
-    notes: List[Dict[str, Any]]
-    error: Optional[str] = None
+# Serialized /resources, /tools and /prompts bodies with their ETags, built on
+# first request; the listings don't change while the server runs
+_listing_bodies: Dict[str, Tuple[bytes, str]] = {}
 
 # Health check endpoint
 @app.get("/health")
@@ -85,98 +90,105 @@ async def health_check():
 
 # MCP Resources endpoints
 @app.get("/resources")
-async def list_resources():
+async def list_resources(request: Request):
     """List available resources"""
     try:
-        resources = await handle_list_resources()
-        return {
-            "success": True,
-            "resources": [
-                {
-                    "uri": r.uri,
-                    "name": r.name,
-                    "description": r.description,
-                    "mimeType": r.mimeType
-                }
-                for r in resources
-            ]
-        }
+        cached = _listing_bodies.get("resources")
+        if cached is None:
+            resources = await handle_list_resources()
+            body = orjson.dumps({
+                "success": True,
+                "resources": [
+                    {
+                        "uri": r.uri,
+                        "name": r.name,
+                        "description": r.description,
+                        "mimeType": r.mimeType
+                    }
+                    for r in resources
+                ]
+            }, default=mcp_json_default)
+            cached = _listing_bodies["resources"] = (body, listing_etag(body))
+        return listing_response(request, *cached)
     except Exception as e:
         logger.error(f"Error listing resources: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/resources/read", response_model=ResourceResponse)
+@app.post("/resources/read")
 async def read_resource(request: ResourceRequest):
     """Read a specific resource"""
     try:
         content = await handle_read_resource(request.uri)
-        return ResourceResponse(success=True, content=content)
+        return ORJSONResponse({"success": True, "content": content, "error": None})
     except Exception as e:
         logger.error(f"Error reading resource {request.uri}: {e}")
-        return ResourceResponse(success=False, content="", error=str(e))
+        return ORJSONResponse({"success": False, "content": "", "error": str(e)})
 
 # MCP Tools endpoints
 @app.get("/tools")
-async def list_tools():
+async def list_tools(request: Request):
     """List available tools"""
     try:
-        tools = await handle_list_tools()
-        return {
-            "success": True,
-            "tools": [
-                {
-                    "name": t.name,
-                    "description": t.description,
-                    "inputSchema": t.inputSchema
-                }
-                for t in tools
-            ]
-        }
+        cached = _listing_bodies.get("tools")
+        if cached is None:
+            tools = await handle_list_tools()
+            body = orjson.dumps({
+                "success": True,
+                "tools": [
+                    {
+                        "name": t.name,
+                        "description": t.description,
+                        "inputSchema": t.inputSchema
+                    }
+                    for t in tools
+                ]
+            })
+            cached = _listing_bodies["tools"] = (body, listing_etag(body))
+        return listing_response(request, *cached)
     except Exception as e:
         logger.error(f"Error listing tools: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/tools/call", response_model=ToolCallResponse)
+@app.post("/tools/call")
 async def call_tool(request: ToolCallRequest):
     """Execute a tool"""
     try:
-        if request.name == "search_notes":
-            result = await search_notes_tool(
-                request.arguments["keyword"],
-                request.arguments.get("max_results", 5)
-            )
-        elif request.name == "summarize_text":
-            result = await summarize_text_tool(request.arguments["note_id"])
-        else:
+        handler = TOOL_DISPATCH.get(request.name)
+        if handler is None:
             raise ValueError(f"Unknown tool: {request.name}")
+        result = await handler(request.arguments)
         
-        return ToolCallResponse(success=True, result=result)
+        return ORJSONResponse({"success": True, "result": result, "error": None})
     except Exception as e:
         logger.error(f"Error calling tool {request.name}: {e}")
-        return ToolCallResponse(success=False, result="", error=str(e))
+        return ORJSONResponse({"success": False, "result": "", "error": str(e)})
 
 # MCP Prompts endpoints
 @app.get("/prompts")
-async def list_prompts():
+async def list_prompts(request: Request):
     """List available prompts"""
     try:
-        prompts = await handle_list_prompts()
-        return {
-            "success": True,
-            "prompts": [
-                {
-                    "name": p.name,
-                    "description": p.description,
-                    "arguments": p.arguments
-                }
-                for p in prompts
-            ]
-        }
+        cached = _listing_bodies.get("prompts")
+        if cached is None:
+            prompts = await handle_list_prompts()
+            body = orjson.dumps({
+                "success": True,
+                "prompts": [
+                    {
+                        "name": p.name,
+                        "description": p.description,
+                        "arguments": p.arguments
+                    }
+                    for p in prompts
+                ]
+            }, default=mcp_json_default)
+            cached = _listing_bodies["prompts"] = (body, listing_etag(body))
+        return listing_response(request, *cached)
     except Exception as e:
         logger.error(f"Error listing prompts: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/prompts/get", response_model=PromptResponse)
+@app.post("/prompts/get")
 async def get_prompt(request: PromptRequest):
     """Get a prompt with arguments"""
     try:
@@ -185,37 +197,40 @@ async def get_prompt(request: PromptRequest):
         else:
             raise ValueError(f"Unknown prompt: {request.name}")
         
-        return PromptResponse(success=True, prompt=prompt)
+        return ORJSONResponse({"success": True, "prompt": prompt, "error": None})
     except Exception as e:
         logger.error(f"Error getting prompt {request.name}: {e}")
-        return PromptResponse(success=False, prompt="", error=str(e))
+        return ORJSONResponse({"success": False, "prompt": "", "error": str(e)})
 
 # Direct note management endpoints (convenience)
 @app.get("/notes")
 async def get_all_notes():
     """Get all notes"""
     try:
-        notes = await load_all_notes()
-        return {
-            "success": True,
-            "notes": [note.to_dict() for note in notes]
-        }
+        # The notes array is serialized once per cache load; only the
+        # envelope is added per request
+        notes_json = await get_notes_json()
+        return Response(
+            b'{"success":true,"notes":' + notes_json + b'}',
+            media_type="application/json"
+        )
     except Exception as e:
         logger.error(f"Error getting notes: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/notes/search", response_model=SearchResponse)
+@app.post("/notes/search")
 async def search_notes(request: SearchRequest):
     """Search notes by keyword"""
     try:
-        notes = await search_notes_by_keyword(request.keyword, request.max_results)
-        return SearchResponse(
-            success=True,
-            notes=[note.to_dict() for note in notes]
-        )
+        results = await search_notes_by_keyword(request.keyword, request.max_results)
+        return ORJSONResponse({
+            "success": True,
+            "notes": [note.to_dict() for note, _ in results],
+            "error": None
+        })
     except Exception as e:
         logger.error(f"Error searching notes: {e}")
-        return SearchResponse(success=False, notes=[], error=str(e))
+        return ORJSONResponse({"success": False, "notes": [], "error": str(e)})
 
 @app.get("/notes/{note_id}")
 async def get_note(note_id: str):
@@ -245,10 +260,34 @@ async def get_note_summary(note_id: str):
         logger.error(f"Error getting note summary {note_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-def run_server(host: str = "127.0.0.1", port: int = 8002):
-    """Run the FastAPI server"""
-    logger.info(f"Starting Knowledge Base HTTP Server on {host}:{port}")
-    uvicorn.run(app, host=host, port=port, log_level="info")
+def default_workers() -> int:
+    """Worker processes to run: KB_WORKERS if set, else up to 4 (one per core)"""
+    configured = os.getenv("KB_WORKERS")
+    if configured:
+        return max(1, int(configured))
+    return min(4, os.cpu_count() or 1)
+
+def run_server(host: str = "127.0.0.1", port: int = 8002, workers: Optional[int] = None):
+    """Run the FastAPI server
+    
+    The notes are read-only here, so each worker simply keeps its own index
+    and watcher; requests spread across processes instead of one GIL.
+    """
+    workers = workers or default_workers()
+    logger.info(f"Starting Knowledge Base HTTP Server on {host}:{port} ({workers} worker(s))")
+    # "auto" picks uvloop and httptools (installed with uvicorn[standard])
+    # where available, falling back to asyncio and h11 elsewhere (e.g. Windows)
+    uvicorn.run(
+        # Multiple workers need an import string rather than the app object
+        "servers.knowledge_base.http_server:app" if workers > 1 else app,
+        host=host,
+        port=port,
+        log_level="info",
+        loop="auto",
+        http="auto",
+        access_log=False,
+        workers=workers
+    )
 
 if __name__ == "__main__":
     run_server()
\ No newline at end of file
@@ -7,15 +7,21 @@ Supports Markdown and JSON note formats with full-text search.
 """
 
 import asyncio
+import heapq
 import json
+import math
 import os
 import sys
+import time
+import threading
 import logging
-from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 import re
-from collections import defaultdict
+import string
+from collections import Counter, defaultdict
+from functools import lru_cache
+import orjson
 
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent.parent.parent))
@@ -40,9 +46,71 @@ server = Server("knowledge-base")
 NOTES_DIR = Path(__file__).parent / "notes"
 PROMPTS_DIR = Path(__file__).parent / "prompts"
 
-# In-memory cache for notes
+NOTE_SUFFIXES = frozenset({'.md', '.json'})
+
+# Characters of note content shown as a search result preview
+SNIPPET_LENGTH = 200
+
+# Lines at the top of a Markdown note searched for its "# " title
+TITLE_SCAN_LINES = 20
+
+# Minimum seconds between scans of NOTES_DIR for changed notes
+CACHE_CHECK_INTERVAL = 1.0
+
+# In-memory cache for notes; the signature is (note file count, newest
+# st_mtime_ns) of NOTES_DIR when the cache was loaded, None before the first load
 _notes_cache: List[Note] = []
-_cache_last_updated: Optional[datetime] = None
+_notes_by_id: Dict[str, Note] = {}
+# Search result previews per note id, built with the cache
+_snippets: Dict[str, str] = {}
+# notes://all as served, built on first read after each cache load
+_notes_all_json: Optional[str] = None
+# All notes as a compact JSON array (the HTTP /notes payload), likewise
+_notes_list_json: Optional[bytes] = None
+_cache_signature: Optional[Tuple[int, int]] = None
+_cache_checked_at: float = 0.0
+
+# Serializes reloads; the generation counts them so callers that waited on the
+# lock can tell another caller already reloaded
+_cache_lock = asyncio.Lock()
+_cache_generation = 0
+
+# Set by the filesystem watcher when a note changes; while the watcher runs,
+# should_refresh_cache checks this flag instead of scanning NOTES_DIR
+_notes_dirty = threading.Event()
+_notes_watcher = None
+
+# BM25 ranking parameters
+BM25_K1 = 1.2
+BM25_B = 0.65
+
+# ASCII punctuation -> space, so str.split() yields the words (avoids a regex
+# pass over every note); tokenization for keyword extraction also drops digits
+_PUNCT_TABLE = str.maketrans(string.punctuation, " " * len(string.punctuation))
+_PUNCT_DIGITS_TABLE = str.maketrans(
+    string.punctuation + string.digits, " " * (len(string.punctuation) + len(string.digits))
+)
+
+# Sentence boundaries and boosted keywords for generate_simple_summary
+_SENT_RE = re.compile(r'[.!?]+')
+_SUMMARY_KEYWORDS = ('important', 'key', 'main', 'primary', 'essential', 'crucial')
+
+# Stop words dropped from FAQ questions without explicit search keywords
+_QUESTION_STOP_WORDS = frozenset({
+    'what', 'how', 'why', 'when', 'where', 'who', 'which', 'can', 'does', 'will', 'should'
+})
+
+# faq_answer.txt, read on first use
+_faq_template: Optional[str] = None
+
+# Inverted index over _notes_cache, rebuilt with it; doc ids are positions in
+# _indexed_notes, the list the index was built from
+_indexed_notes: List[Note] = []
+_postings: Dict[str, List[Tuple[int, int]]] = {}
+_doc_len: List[int] = []
+_avgdl: float = 0.0
+_df: Dict[str, int] = {}
+_num_docs: int = 0
 
 # Resource handlers
 @server.list_resources()
@@ -60,9 +128,15 @@ async def handle_list_resources() -> List[Resource]:
 @server.read_resource()
 async def handle_read_resource(uri: str) -> str:
     """Read resource content by URI"""
+    global _notes_all_json
     if uri == "notes://all":
         notes = await load_all_notes()
-        return json.dumps([note.to_dict() for note in notes], indent=2)
+        # Serialized once per cache load; set_notes_cache clears it
+        if _notes_all_json is None:
+            _notes_all_json = orjson.dumps(
+                [note.to_dict() for note in notes], option=orjson.OPT_INDENT_2
+            ).decode()
+        return _notes_all_json
     else:
         raise ValueError(f"Unknown resource URI: {uri}")
 
@@ -108,27 +182,25 @@ async def handle_list_tools() -> List[Tool]:
         )
     ]
 
+# Tool name -> coroutine factory taking the call's arguments
+TOOL_DISPATCH: Dict[str, Callable[[Dict[str, Any]], Awaitable[str]]] = {
+    "search_notes": lambda a: search_notes_tool(a["keyword"], a.get("max_results", 5)),
+    "summarize_text": lambda a: summarize_text_tool(a["note_id"]),
+}
+
 @server.call_tool()
 async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
     """Execute tool by name with arguments"""
-    try:
-        if name == "search_notes":
-            result = await search_notes_tool(
-                arguments["keyword"],
-                arguments.get("max_results", 5)
-            )
-            return [TextContent(type="text", text=result)]
-        
-        elif name == "summarize_text":
-            result = await summarize_text_tool(arguments["note_id"])
-            return [TextContent(type="text", text=result)]
-        
-        else:
-            raise ValueError(f"Unknown tool: {name}")
+    handler = TOOL_DISPATCH.get(name)
+    if handler is None:
+        raise ValueError(f"Unknown tool: {name}")
     
-    except Exception as e:
-        error_msg = f"Error executing tool {name}: {str(e)}"
-        return [TextContent(type="text", text=error_msg)]
+    # The tools report their own failures; only bad arguments are handled here
+    try:
+        result = await handler(arguments)
+    except KeyError as e:
+        result = f"Error executing tool {name}: missing required argument {e}"
+    return [TextContent(type="text", text=result)]
 
 # Prompt handlers
 @server.list_prompts()
@@ -164,52 +236,172 @@ async def handle_get_prompt(name: str, arguments: Dict[str, str]) -> str:
 # Helper functions
 async def load_all_notes() -> List[Note]:
     """Load all notes from the notes directory"""
-    global _notes_cache, _cache_last_updated
-    
     try:
         # Check if cache needs refresh
-        if _cache_last_updated is None or should_refresh_cache():
-            _notes_cache = []
-            
-            if not NOTES_DIR.exists():
-                NOTES_DIR.mkdir(parents=True, exist_ok=True)
-                return []
-            
-            # Load all note files
-            for file_path in NOTES_DIR.iterdir():
-                if file_path.is_file() and file_path.suffix in ['.md', '.json']:
-                    try:
-                        note = await load_note_from_file(file_path)
-                        if note:
-                            _notes_cache.append(note)
-                    except Exception as e:
-                        print(f"Warning: Could not load note {file_path}: {e}")
-                        continue
-            
-            _cache_last_updated = datetime.utcnow()
+        if should_refresh_cache():
+            seen_generation = _cache_generation
+            async with _cache_lock:
+                # Callers that were waiting on the lock find it already reloaded
+                if _cache_generation == seen_generation:
+                    await reload_notes()
         
         return _notes_cache
     
-    except Exception as e:
+    except OSError as e:
+        # Keep the last good notes rather than dropping the whole cache
         print(f"Error loading notes: {e}")
-        return []
+        return _notes_cache
+
+async def reload_notes():
+    """Re-read every note file and replace the cache"""
+    global _cache_signature
+    
+    if not NOTES_DIR.exists():
+        NOTES_DIR.mkdir(parents=True, exist_ok=True)
+        set_notes_cache([], {})
+        return
+    
+    # Taken before reading, so edits made during the load trigger another one
+    _notes_dirty.clear()
+    signature = notes_dir_signature()
+    
+    # Read, parse and tokenize all note files concurrently on worker threads
+    paths = [p for p in NOTES_DIR.iterdir() if p.is_file() and p.suffix in NOTE_SUFFIXES]
+    results = await asyncio.gather(
+        *[asyncio.to_thread(ingest_note_sync, p) for p in paths],
+        return_exceptions=True
+    )
+    
+    notes = []
+    doc_tokens = {}
+    for file_path, result in zip(paths, results):
+        if isinstance(result, Exception):
+            print(f"Warning: Could not load note {file_path}: {result}")
+        elif result:
+            note, term_freqs = result
+            notes.append(note)
+            doc_tokens[note.id] = term_freqs
+    
+    set_notes_cache(notes, doc_tokens)
+    _cache_signature = signature
+
+def note_snippet(note: Note) -> str:
+    """Preview text shown for a note in search results"""
+    if len(note.content) > SNIPPET_LENGTH:
+        return note.content[:SNIPPET_LENGTH] + "..."
+    return note.content
+
+def set_notes_cache(notes: List[Note], doc_tokens: Dict[str, Counter]):
+    """Replace the cached notes and rebuild the lookups derived from them
+    
+    doc_tokens maps note id to the note's term frequencies. Everything is
+    swapped in whole so concurrent readers never see a partial list.
+    """
+    global _notes_cache, _notes_by_id, _snippets, _notes_all_json, _notes_list_json, _cache_generation
+    _notes_cache = notes
+    _notes_by_id = {note.id: note for note in notes}
+    _snippets = {note.id: note_snippet(note) for note in notes}
+    _notes_all_json = None
+    _notes_list_json = None
+    _cache_generation += 1
+    build_search_index(notes, doc_tokens)
+
+def notes_dir_signature() -> Tuple[int, int]:
+    """(number of note files, newest st_mtime_ns) for NOTES_DIR"""
+    count = 0
+    newest = 0
+    with os.scandir(NOTES_DIR) as entries:
+        for entry in entries:
+            if entry.is_file() and os.path.splitext(entry.name)[1] in NOTE_SUFFIXES:
+                count += 1
+                newest = max(newest, entry.stat().st_mtime_ns)
+    return count, newest
 
 def should_refresh_cache() -> bool:
-    """Check if cache should be refreshed based on file modification times"""
-    if not _cache_last_updated:
+    """Check if cache should be refreshed based on file modification times
+    
+    With the watcher running this only checks its dirty flag. Otherwise
+    NOTES_DIR is scanned at most once per CACHE_CHECK_INTERVAL; the file count
+    is compared too so deleted notes are noticed.
+    """
+    global _cache_checked_at
+    if _cache_signature is None:
         return True
+    if _notes_watcher is not None:
+        return _notes_dirty.is_set()
     
-    try:
-        for file_path in NOTES_DIR.iterdir():
-            if file_path.is_file() and file_path.suffix in ['.md', '.json']:
-                file_mtime = datetime.fromtimestamp(file_path.stat().st_mtime)
-                if file_mtime > _cache_last_updated:
-                    return True
+    now = time.monotonic()
+    if now - _cache_checked_at < CACHE_CHECK_INTERVAL:
         return False
-    except:
+    _cache_checked_at = now
+    
+    try:
+        return notes_dir_signature() != _cache_signature
+    except FileNotFoundError:
+        # Directory is gone; load_all_notes recreates it
         return True
+    except OSError as e:
+        # Likely transient (e.g. permissions); keep serving the cached notes
+        logging.warning(f"Could not check {NOTES_DIR} for changes: {e}")
+        return False
+
+class _NotesChangeHandler:
+    """watchdog event handler that flags the notes cache dirty"""
+    
+    def dispatch(self, event):
+        if event.event_type not in ("created", "modified", "deleted", "moved"):
+            return
+        paths = (event.src_path, getattr(event, "dest_path", ""))
+        if any(os.path.splitext(str(p))[1] in NOTE_SUFFIXES for p in paths if p):
+            _notes_dirty.set()
+
+def start_notes_watcher():
+    """Watch NOTES_DIR for changes so the cache doesn't have to poll it
+    
+    Safe to call more than once. If the watcher can't start, the mtime
+    polling in should_refresh_cache stays in effect.
+    """
+    global _notes_watcher
+    if _notes_watcher is not None:
+        return
+    
+    try:
+        from watchdog.observers import Observer
+        
+        NOTES_DIR.mkdir(parents=True, exist_ok=True)
+        observer = Observer()
+        observer.schedule(_NotesChangeHandler(), str(NOTES_DIR), recursive=False)
+        observer.daemon = True
+        observer.start()
+    except (ImportError, OSError) as e:
+        logging.warning(f"Notes watcher unavailable, polling for changes instead: {e}")
+        return
+    
+    # Changes made before the watch started aren't reported, so reload once
+    _notes_dirty.set()
+    _notes_watcher = observer
+
+def stop_notes_watcher():
+    """Stop the watcher started by start_notes_watcher, if any"""
+    global _notes_watcher
+    if _notes_watcher is None:
+        return
+    observer, _notes_watcher = _notes_watcher, None
+    observer.stop()
+    observer.join(timeout=2.0)
 
 async def load_note_from_file(file_path: Path) -> Optional[Note]:
+    """Load a single note from file without blocking the event loop"""
+    return await asyncio.to_thread(load_note_sync, file_path)
+
+def ingest_note_sync(file_path: Path) -> Optional[Tuple[Note, Counter]]:
+    """Load a note and count its search terms, so tokenizing happens off the event loop"""
+    note = load_note_sync(file_path)
+    if note is None:
+        return None
+    return note, note_term_freqs(note)
+
+def load_note_sync(file_path: Path) -> Optional[Note]:
     """Load a single note from file"""
     try:
         content = file_path.read_text(encoding='utf-8')
@@ -221,7 +413,7 @@ async def load_note_from_file(file_path: Path) -> Optional[Note]:
             note_content = data.get('content', content)
         else:
             # Handle Markdown notes
-            title = extract_title_from_markdown(content) or file_path.stem.replace('_', ' ').replace('-', ' ').title()
+            title = extract_title_from_markdown(content) or title_from_stem(file_path.stem)
             note_content = content
         
         note = Note.from_file(str(file_path), note_content, title)
@@ -232,38 +424,97 @@ async def load_note_from_file(file_path: Path) -> Optional[Note]:
         return None
 
 def extract_title_from_markdown(content: str) -> Optional[str]:
-    """Extract title from markdown content"""
-    lines = content.split('\n')
-    for line in lines:
-        line = line.strip()
+    """Extract title from markdown content
+    
+    Only the first TITLE_SCAN_LINES lines are looked at, without splitting
+    the rest of the file.
+    """
+    start = 0
+    for _ in range(TITLE_SCAN_LINES):
+        end = content.find('\n', start)
+        line = (content[start:] if end == -1 else content[start:end]).strip()
         if line.startswith('# '):
             return line[2:].strip()
+        if end == -1:
+            break
+        start = end + 1
     return None
 
-async def search_notes_by_keyword(keyword: str, max_results: int = 5) -> List[Note]:
-    """Search notes by keyword with relevance scoring"""
-    notes = await load_all_notes()
+@lru_cache(maxsize=1024)
+def title_from_stem(stem: str) -> str:
+    """Fallback note title derived from a file name"""
+    return stem.replace('_', ' ').replace('-', ' ').title()
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase search terms"""
+    return [w for w in text.lower().translate(_PUNCT_TABLE).split() if len(w) >= 2]
+
+def note_term_freqs(note: Note) -> Counter:
+    """Search term frequencies for a note"""
+    # Titles are indexed with the body so title matches count too
+    return Counter(tokenize(f"{note.title}\n{note.content}"))
+
+def build_search_index(notes: List[Note], doc_tokens: Dict[str, Counter]):
+    """Rebuild the inverted index and corpus statistics used for BM25 ranking
+    
+    Uses the term frequencies counted at ingest (see note_term_freqs).
+    """
+    global _indexed_notes, _postings, _doc_len, _avgdl, _df, _num_docs
+    
+    postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+    doc_len = []
+    for doc_id, note in enumerate(notes):
+        term_freqs = doc_tokens[note.id]
+        doc_len.append(sum(term_freqs.values()))
+        for term, tf in term_freqs.items():
+            postings[term].append((doc_id, tf))
+    
+    _indexed_notes = list(notes)
+    _postings = dict(postings)
+    _doc_len = doc_len
+    _num_docs = len(doc_len)
+    _avgdl = (sum(doc_len) / _num_docs) if _num_docs else 0.0
+    _df = {term: len(posting) for term, posting in _postings.items()}
+
+async def search_notes_by_keyword(keyword: str, max_results: int = 5) -> List[Tuple[Note, float]]:
+    """Search notes by keyword, ranked with BM25 over the inverted index
+    
+    Returns (note, score) pairs, best first.
+    """
+    await load_all_notes()
+    notes = _indexed_notes
+    avgdl = _avgdl or 1.0
     
-    # Calculate relevance scores
-    scored_notes = []
-    for note in notes:
-        score = note.search_relevance(keyword)
-        if score > 0:
-            scored_notes.append((note, score))
+    # IDF for each query term, computed once per query
+    idf = {}
+    for term in set(tokenize(keyword)):
+        df = _df.get(term)
+        if df:
+            idf[term] = math.log((_num_docs - df + 0.5) / (df + 0.5) + 1)
     
-    # Sort by relevance score (descending)
-    scored_notes.sort(key=lambda x: x[1], reverse=True)
+    # Only notes in the query terms' posting lists are scored
+    scores: Dict[int, float] = defaultdict(float)
+    for term, term_idf in idf.items():
+        for doc_id, tf in _postings[term]:
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * _doc_len[doc_id] / avgdl)
+            scores[doc_id] += term_idf * tf * (BM25_K1 + 1) / (tf + norm)
     
     # Return top results
-    return [note for note, score in scored_notes[:max_results]]
+    top = heapq.nlargest(max_results, scores.items(), key=lambda x: x[1])
+    return [(notes[doc_id], score) for doc_id, score in top]
+
+async def get_notes_json() -> bytes:
+    """All notes as a compact JSON array, serialized once per cache load"""
+    global _notes_list_json
+    notes = await load_all_notes()
+    if _notes_list_json is None:
+        _notes_list_json = orjson.dumps([note.to_dict() for note in notes])
+    return _notes_list_json
 
 async def get_note_by_id(note_id: str) -> Optional[Note]:
     """Get specific note by ID"""
-    notes = await load_all_notes()
-    for note in notes:
-        if note.id == note_id:
-            return note
-    return None
+    await load_all_notes()
+    return _notes_by_id.get(note_id)
 
 # Tool implementations
 async def search_notes_tool(keyword: str, max_results: int = 5) -> str:
@@ -274,23 +525,19 @@ async def search_notes_tool(keyword: str, max_results: int = 5) -> str:
         if not notes:
             return f"🔍 No notes found containing '{keyword}'"
         
-        result = f"🔍 Found {len(notes)} note(s) containing '{keyword}':\n\n"
+        parts = [f"🔍 Found {len(notes)} note(s) containing '{keyword}':\n\n"]
         
-        for i, note in enumerate(notes, 1):
-            # Calculate relevance score for display
-            score = note.search_relevance(keyword)
-            
-            result += f"**{i}. {note.title}**\n"
-            result += f"File: {Path(note.file_path).name}\n"
-            result += f"Tags: {', '.join(note.tags) if note.tags else 'None'}\n"
-            result += f"Word count: {note.word_count}\n"
-            result += f"Relevance: {score:.1f}\n"
+        for i, (note, score) in enumerate(notes, 1):
+            parts.append(f"**{i}. {note.title}**\n")
+            parts.append(f"File: {os.path.basename(note.file_path)}\n")
+            parts.append(f"Tags: {', '.join(note.tags) if note.tags else 'None'}\n")
+            parts.append(f"Word count: {note.word_count}\n")
+            parts.append(f"Relevance: {score:.1f}\n")
             
             # Show a snippet of content
-            content_snippet = note.content[:200] + "..." if len(note.content) > 200 else note.content
-            result += f"Preview: {content_snippet}\n\n"
+            parts.append(f"Preview: {_snippets.get(note.id) or note_snippet(note)}\n\n")
         
-        return result
+        return "".join(parts)
     
     except Exception as e:
         return f"❌ Error searching notes: {str(e)}"
@@ -304,10 +551,10 @@ async def summarize_text_tool(note_id: str) -> str:
             return f"❌ Note with ID '{note_id}' not found"
         
         # Generate a simple summary
-        summary = generate_simple_summary(note.content)
+        summary = cached_summary(note.content)
         
         result = f"📄 **Summary of '{note.title}'**\n\n"
-        result += f"**File:** {Path(note.file_path).name}\n"
+        result += f"**File:** {os.path.basename(note.file_path)}\n"
         result += f"**Word count:** {note.word_count}\n"
         result += f"**Tags:** {', '.join(note.tags) if note.tags else 'None'}\n"
         result += f"**Created:** {note.created_at[:10]}\n\n"
@@ -321,14 +568,15 @@ async def summarize_text_tool(note_id: str) -> str:
 def generate_simple_summary(content: str, max_sentences: int = 3) -> str:
     """Generate a simple extractive summary"""
     # Split into sentences
-    sentences = re.split(r'[.!?]+', content)
-    sentences = [s.strip() for s in sentences if s.strip()]
+    sentences = [s.strip() for s in _SENT_RE.split(content)]
+    sentences = [s for s in sentences if s]
     
     if len(sentences) <= max_sentences:
         return '. '.join(sentences) + '.'
     
     # Simple scoring based on sentence length and position
-    scored_sentences = []
+    early_cutoff = len(sentences) * 0.3
+    scores = []
     for i, sentence in enumerate(sentences):
         score = 0
         
@@ -337,38 +585,37 @@ def generate_simple_summary(content: str, max_sentences: int = 3) -> str:
             score += 2
         
         # Prefer sentences near the beginning
-        if i < len(sentences) * 0.3:
+        if i < early_cutoff:
             score += 1
         
         # Prefer sentences with common keywords
-        common_words = ['important', 'key', 'main', 'primary', 'essential', 'crucial']
-        for word in common_words:
-            if word.lower() in sentence.lower():
-                score += 1
+        sentence_lower = sentence.lower()
+        score += sum(1 for word in _SUMMARY_KEYWORDS if word in sentence_lower)
         
-        scored_sentences.append((sentence, score))
-    
-    # Sort by score and take top sentences
-    scored_sentences.sort(key=lambda x: x[1], reverse=True)
-    top_sentences = [s[0] for s in scored_sentences[:max_sentences]]
+        scores.append(score)
     
-    # Reorder by original position
-    original_order = []
-    for sentence in sentences:
-        if sentence in top_sentences:
-            original_order.append(sentence)
-            if len(original_order) == max_sentences:
-                break
+    # Take the top-scoring sentences (earlier ones win ties) in original order
+    top_indexes = heapq.nlargest(max_sentences, range(len(sentences)), key=scores.__getitem__)
+    return '. '.join(sentences[i] for i in sorted(top_indexes)) + '.'
+
+@lru_cache(maxsize=256)
+def cached_summary(content: str, max_sentences: int = 3) -> str:
+    """generate_simple_summary, memoized on the note content
     
-    return '. '.join(original_order) + '.'
+    A str caches its own hash and cached notes keep the same content object,
+    so a repeat lookup costs no more than hashing a short key.
+    """
+    return generate_simple_summary(content, max_sentences)
 
 async def get_faq_answer_prompt(arguments: Dict[str, str]) -> str:
     """Get the FAQ answer prompt with relevant notes"""
+    global _faq_template
     try:
-        # Load prompt template
-        prompt_file = PROMPTS_DIR / "faq_answer.txt"
-        with open(prompt_file, 'r', encoding='utf-8') as f:
-            template = f.read()
+        # Load prompt template (once; it doesn't change at runtime)
+        if _faq_template is None:
+            prompt_file = PROMPTS_DIR / "faq_answer.txt"
+            _faq_template = await asyncio.to_thread(prompt_file.read_text, encoding='utf-8')
+        template = _faq_template
         
         question = arguments.get("question", "")
         search_keywords = arguments.get("search_keywords", "")
@@ -376,10 +623,11 @@ async def get_faq_answer_prompt(arguments: Dict[str, str]) -> str:
         # If no search keywords provided, extract from question
         if not search_keywords and question:
             # Simple keyword extraction from question
-            words = re.findall(r'\b[a-zA-Z]{3,}\b', question.lower())
-            # Remove common question words
-            stop_words = {'what', 'how', 'why', 'when', 'where', 'who', 'which', 'can', 'does', 'will', 'should'}
-            keywords = [w for w in words if w not in stop_words]
+            # Words of 3+ letters, minus common question words
+            keywords = [
+                w for w in question.lower().translate(_PUNCT_DIGITS_TABLE).split()
+                if len(w) >= 3 and w not in _QUESTION_STOP_WORDS
+            ]
             search_keywords = ' '.join(keywords[:3])  # Use top 3 keywords
         
         # Search for relevant notes
@@ -388,11 +636,13 @@ async def get_faq_answer_prompt(arguments: Dict[str, str]) -> str:
             try:
                 notes = await search_notes_by_keyword(search_keywords, 3)
                 if notes:
-                    relevant_notes_text = ""
-                    for note in notes:
-                        relevant_notes_text += f"**{note.title}**\n"
-                        relevant_notes_text += f"{note.content[:500]}...\n\n" if len(note.content) > 500 else f"{note.content}\n\n"
-            except:
+                    relevant_notes_text = "".join(
+                        f"**{note.title}**\n"
+                        + (f"{note.content[:500]}...\n\n" if len(note.content) > 500 else f"{note.content}\n\n")
+                        for note, _ in notes
+                    )
+            except Exception as e:
+                logging.warning(f"Could not retrieve notes for FAQ prompt: {e}")
                 relevant_notes_text = "Error retrieving relevant notes"
         
         # Substitute variables in template
@@ -410,6 +660,7 @@ async def main():
     """Run the server using stdio transport"""
     logging.basicConfig(level=logging.DEBUG, filename="kb_server.log")
     logging.debug("Knowledge Base Server: Main function started.")
+    start_notes_watcher()
     try:
         async with stdio_server() as (read_stream, write_stream):
             logging.debug("Knowledge Base Server: Stdio server started.")
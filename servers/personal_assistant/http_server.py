@@ -7,29 +7,46 @@ FastAPI wrapper for the Personal Assistant MCP Server
 import asyncio
 import json
 import logging
-from typing import Any, Dict, List, Optional
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, Field
+import orjson
 import uvicorn
 
 # Import the original MCP server functions
 from .server import (
     load_tasks, save_tasks, add_task_tool, remove_task_tool,
-    get_weather_tool, search_web_tool, get_summarize_day_prompt,
-    handle_list_resources, handle_read_resource, handle_list_tools,
-    handle_list_prompts
+    handle_read_resource, close_http_client, RESOURCES, TOOLS, PROMPTS,
+    start_tasks_flusher, stop_tasks_flusher, TOOL_DISPATCH,
+    PROMPT_DISPATCH
 )
+from shared.http_utils import mcp_json_default, listing_etag, listing_response
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the tasks.json writer, and flush it and close the shared
+    outbound HTTP client when the server stops"""
+    start_tasks_flusher()
+    yield
+    await stop_tasks_flusher()
+    await close_http_client()
+
 # FastAPI app
 app = FastAPI(
     title="Personal Assistant MCP Server",
     description="HTTP API for Personal Assistant MCP functionality",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    # orjson serializes the task and listing payloads much faster
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -41,32 +58,84 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Request/Response models
+# Compress larger payloads for clients that accept gzip; small ones such as
+# /health aren't worth it
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+# Most calls a single /tools/batch request may carry
+MAX_BATCH_CALLS = 20
+
+# Most batched tool calls running at once, across all batch requests
+BATCH_CONCURRENCY = 4
+_batch_slots = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+# Tools that change the task list; within a batch these run one at a time, in
+# call order, so e.g. an add followed by a remove of the same task behaves
+ORDERED_TOOLS = frozenset({"add_task", "remove_task"})
+
+# Request models (responses are plain dicts, serialized straight to orjson
+# without a validation pass)
 class ToolCallRequest(BaseModel):
     name: str
     arguments: Dict[str, Any]
 
-class ToolCallResponse(BaseModel):
-    success: bool
-    result: str
-    error: Optional[str] = None
+class ToolBatchRequest(BaseModel):
+    calls: List[ToolCallRequest] = Field(..., max_length=MAX_BATCH_CALLS)
 
 class ResourceRequest(BaseModel):
     uri: str
 
-class ResourceResponse(BaseModel):
-    success: bool
-    content: str
-    error: Optional[str] = None
-
 class PromptRequest(BaseModel):
     name: str
     arguments: Dict[str, str] = {}
 
-class PromptResponse(BaseModel):
-    success: bool
-    prompt: str
-    error: Optional[str] = None
+class TaskCreate(BaseModel):
+    description: str
+    due_date: str
+    priority: str = "medium"
+
+# The listings never change, so their response bodies (and ETags, for
+# conditional GETs) are computed once
+RESOURCES_BODY = orjson.dumps({
+    "success": True,
+    "resources": [
+        {
+            "uri": r.uri,
+            "name": r.name,
+            "description": r.description,
+            "mimeType": r.mimeType
+        }
+        for r in RESOURCES
+    ]
+}, default=mcp_json_default)
+
+TOOLS_BODY = orjson.dumps({
+    "success": True,
+    "tools": [
+        {
+            "name": t.name,
+            "description": t.description,
+            "inputSchema": t.inputSchema
+        }
+        for t in TOOLS
+    ]
+})
+
+PROMPTS_BODY = orjson.dumps({
+    "success": True,
+    "prompts": [
+        {
+            "name": p.name,
+            "description": p.description,
+            "arguments": p.arguments
+        }
+        for p in PROMPTS
+    ]
+}, default=mcp_json_default)
+
+RESOURCES_ETAG = listing_etag(RESOURCES_BODY)
+TOOLS_ETAG = listing_etag(TOOLS_BODY)
+PROMPTS_ETAG = listing_etag(PROMPTS_BODY)
 
 # Health check endpoint
 @app.get("/health")
@@ -76,115 +145,98 @@ async def health_check():
 
 # MCP Resources endpoints
 @app.get("/resources")
-async def list_resources():
+async def list_resources(request: Request):
     """List available resources"""
-    try:
-        resources = await handle_list_resources()
-        return {
-            "success": True,
-            "resources": [
-                {
-                    "uri": r.uri,
-                    "name": r.name,
-                    "description": r.description,
-                    "mimeType": r.mimeType
-                }
-                for r in resources
-            ]
-        }
-    except Exception as e:
-        logger.error(f"Error listing resources: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    return listing_response(request, RESOURCES_BODY, RESOURCES_ETAG)
 
-@app.post("/resources/read", response_model=ResourceResponse)
+@app.post("/resources/read")
 async def read_resource(request: ResourceRequest):
     """Read a specific resource"""
     try:
         content = await handle_read_resource(request.uri)
-        return ResourceResponse(success=True, content=content)
+        return ORJSONResponse({"success": True, "content": content, "error": None})
     except Exception as e:
         logger.error(f"Error reading resource {request.uri}: {e}")
-        return ResourceResponse(success=False, content="", error=str(e))
+        return ORJSONResponse({"success": False, "content": "", "error": str(e)})
 
 # MCP Tools endpoints
 @app.get("/tools")
-async def list_tools():
+async def list_tools(request: Request):
     """List available tools"""
-    try:
-        tools = await handle_list_tools()
-        return {
-            "success": True,
-            "tools": [
-                {
-                    "name": t.name,
-                    "description": t.description,
-                    "inputSchema": t.inputSchema
-                }
-                for t in tools
-            ]
-        }
-    except Exception as e:
-        logger.error(f"Error listing tools: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    return listing_response(request, TOOLS_BODY, TOOLS_ETAG)
 
-@app.post("/tools/call", response_model=ToolCallResponse)
-async def call_tool(request: ToolCallRequest):
-    """Execute a tool"""
+async def run_tool_call(request: ToolCallRequest) -> Dict[str, Any]:
+    """Execute a tool, returning the /tools/call response body"""
     try:
-        if request.name == "add_task":
-            result = await add_task_tool(
-                request.arguments["description"],
-                request.arguments["due_date"],
-                request.arguments.get("priority", "medium")
-            )
-        elif request.name == "remove_task":
-            result = await remove_task_tool(request.arguments["id"])
-        elif request.name == "get_weather":
-            result = await get_weather_tool(request.arguments["city"])
-        elif request.name == "search_web":
-            result = await search_web_tool(request.arguments["query"])
-        else:
+        handler = TOOL_DISPATCH.get(request.name)
+        if handler is None:
             raise ValueError(f"Unknown tool: {request.name}")
+        result = await handler(request.arguments)
         
-        return ToolCallResponse(success=True, result=result)
+        return {"success": True, "result": result, "error": None}
     except Exception as e:
         logger.error(f"Error calling tool {request.name}: {e}")
-        return ToolCallResponse(success=False, result="", error=str(e))
+        return {"success": False, "result": "", "error": str(e)}
+
+@app.post("/tools/call")
+async def call_tool(request: ToolCallRequest):
+    """Execute a tool"""
+    return ORJSONResponse(await run_tool_call(request))
+
+async def run_batched_tool_call(request: ToolCallRequest) -> Dict[str, Any]:
+    """run_tool_call, holding one of the BATCH_CONCURRENCY slots"""
+    async with _batch_slots:
+        return await run_tool_call(request)
+
+async def run_ordered_tool_calls(calls: List[ToolCallRequest]) -> List[Dict[str, Any]]:
+    """Run calls one after another, in order"""
+    return [await run_batched_tool_call(call) for call in calls]
+
+@app.post("/tools/batch")
+async def call_tools_batch(request: ToolBatchRequest):
+    """Execute several tools concurrently, in one round trip
+    
+    Calls to ORDERED_TOOLS run sequentially in call order, alongside the
+    others. Results are in call order, each shaped like a /tools/call response.
+    """
+    ordered = [i for i, call in enumerate(request.calls) if call.name in ORDERED_TOOLS]
+    unordered = [i for i, call in enumerate(request.calls) if call.name not in ORDERED_TOOLS]
+    ordered_results, *unordered_results = await asyncio.gather(
+        run_ordered_tool_calls([request.calls[i] for i in ordered]),
+        *(run_batched_tool_call(request.calls[i]) for i in unordered)
+    )
+    results: List[Dict[str, Any]] = [None] * len(request.calls)
+    for i, result in zip(ordered, ordered_results):
+        results[i] = result
+    for i, result in zip(unordered, unordered_results):
+        results[i] = result
+    return ORJSONResponse({
+        "success": True,
+        "results": [
+            {"name": call.name, **result}
+            for call, result in zip(request.calls, results)
+        ]
+    })
 
 # MCP Prompts endpoints
 @app.get("/prompts")
-async def list_prompts():
+async def list_prompts(request: Request):
     """List available prompts"""
-    try:
-        prompts = await handle_list_prompts()
-        return {
-            "success": True,
-            "prompts": [
-                {
-                    "name": p.name,
-                    "description": p.description,
-                    "arguments": p.arguments
-                }
-                for p in prompts
-            ]
-        }
-    except Exception as e:
-        logger.error(f"Error listing prompts: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    return listing_response(request, PROMPTS_BODY, PROMPTS_ETAG)
 
-@app.post("/prompts/get", response_model=PromptResponse)
+@app.post("/prompts/get")
 async def get_prompt(request: PromptRequest):
     """Get a prompt with arguments"""
     try:
-        if request.name == "summarize_day":
-            prompt = await get_summarize_day_prompt(request.arguments)
-        else:
+        handler = PROMPT_DISPATCH.get(request.name)
+        if handler is None:
             raise ValueError(f"Unknown prompt: {request.name}")
+        prompt = await handler(request.arguments)
         
-        return PromptResponse(success=True, prompt=prompt)
+        return ORJSONResponse({"success": True, "prompt": prompt, "error": None})
     except Exception as e:
         logger.error(f"Error getting prompt {request.name}: {e}")
-        return PromptResponse(success=False, prompt="", error=str(e))
+        return ORJSONResponse({"success": False, "prompt": "", "error": str(e)})
 
 # Direct task management endpoints (convenience)
 @app.get("/tasks")
@@ -192,20 +244,21 @@ async def get_tasks():
     """Get all tasks"""
     try:
         tasks = await load_tasks()
-        return {
+        # orjson serializes the Task dataclasses natively
+        return ORJSONResponse({
             "success": True,
-            "tasks": [task.to_dict() for task in tasks]
-        }
+            "tasks": tasks
+        })
     except Exception as e:
         logger.error(f"Error getting tasks: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/tasks")
-async def add_task(description: str, due_date: str, priority: str = "medium"):
-    """Add a new task"""
+async def add_task(task: TaskCreate):
+    """Add a new task from a JSON body"""
     try:
-        result = await add_task_tool(description, due_date, priority)
-        return {"success": True, "message": result}
+        result = await add_task_tool(task.description, task.due_date, task.priority)
+        return ORJSONResponse({"success": True, "message": result})
     except Exception as e:
         logger.error(f"Error adding task: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -223,7 +276,17 @@ async def delete_task(task_id: str):
 def run_server(host: str = "127.0.0.1", port: int = 8001):
     """Run the FastAPI server"""
     logger.info(f"Starting Personal Assistant HTTP Server on {host}:{port}")
-    uvicorn.run(app, host=host, port=port, log_level="info")
+    # "auto" picks uvloop and httptools (installed with uvicorn[standard])
+    # where available, falling back to asyncio and h11 elsewhere (e.g. Windows)
+    uvicorn.run(
+        app,
+        host=host,
+        port=port,
+        log_level="info",
+        loop="auto",
+        http="auto",
+        access_log=False
+    )
 
 if __name__ == "__main__":
     run_server()
\ No newline at end of file
@@ -7,14 +7,16 @@ Exposes resources, tools, and prompts for personal productivity.
 """
 
 import asyncio
-import json
 import os
+import random
 import sys
+import time
 import logging
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 from pathlib import Path
 import httpx
+import orjson
 from dotenv import load_dotenv
 
 # Add parent directory to path for imports
@@ -39,41 +41,178 @@ load_dotenv()
 # Server initialization
 server = Server("personal-assistant")
 
+# stdout is the stdio transport, so diagnostics must go through logging
+logger = logging.getLogger(__name__)
+
 # Configuration
 TASKS_FILE = Path(__file__).parent / "tasks.json"
 PROMPTS_DIR = Path(__file__).parent / "prompts"
 OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY")
 TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
 
+# Static listings, built once rather than on every list request
+RESOURCES: List[Resource] = [
+    Resource(
+        uri="today://date",
+        name="Current Date and Time",
+        description="Get the current date and time",
+        mimeType="text/plain"
+    ),
+    Resource(
+        uri="tasks://list",
+        name="Task List",
+        description="Get all tasks from the task list",
+        mimeType="application/json"
+    )
+]
+
+TOOLS: List[Tool] = [
+    Tool(
+        name="add_task",
+        description="Add a new task to the task list",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "description": {
+                    "type": "string",
+                    "description": "Task description"
+                },
+                "due_date": {
+                    "type": "string",
+                    "description": "Due date in ISO format (YYYY-MM-DD)"
+                },
+                "priority": {
+                    "type": "string",
+                    "enum": ["low", "medium", "high"],
+                    "description": "Task priority",
+                    "default": "medium"
+                }
+            },
+            "required": ["description", "due_date"]
+        }
+    ),
+    Tool(
+        name="remove_task",
+        description="Remove a task from the task list",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "id": {
+                    "type": "string",
+                    "description": "Task ID to remove"
+                }
+            },
+            "required": ["id"]
+        }
+    ),
+    Tool(
+        name="get_weather",
+        description="Get weather information for a city",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "city": {
+                    "type": "string",
+                    "description": "City name"
+                }
+            },
+            "required": ["city"]
+        }
+    ),
+    Tool(
+        name="search_web",
+        description="Search the web using Tavily API",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "Search query"
+                }
+            },
+            "required": ["query"]
+        }
+    )
+]
+
+PROMPTS: List[Prompt] = [
+    Prompt(
+        name="summarize_day",
+        description="Generate a daily summary with tasks, weather, and search results",
+        arguments=[
+            {
+                "name": "city",
+                "description": "City for weather information",
+                "required": False
+            },
+            {
+                "name": "search_query",
+                "description": "Optional search query for additional context",
+                "required": False
+            }
+        ]
+    )
+]
+
+# In-memory copy of tasks.json (by task id, in file order) and the file's
+# st_mtime_ns when it was last read or written
+_tasks_cache: Optional[Dict[str, Task]] = None
+_tasks_mtime_ns: Optional[int] = None
+_tasks_lock = asyncio.Lock()
+
+# Writes are batched: mutations set _tasks_dirty and the flusher task writes
+# tasks.json TASKS_SAVE_DELAY seconds after the first change of a burst. A
+# failed write is retried with backoff, up to TASKS_RETRY_MAX_DELAY apart
+TASKS_SAVE_DELAY = 0.1
+TASKS_RETRY_MAX_DELAY = 30.0
+_tasks_dirty = asyncio.Event()
+_tasks_flusher: Optional[asyncio.Task] = None
+
+# Shared client for the weather and search APIs, so connections are reused
+_http_client: Optional[httpx.AsyncClient] = None
+
+# Recent API responses as (time.monotonic() when fetched, data), so repeated
+# lookups skip the round-trip and don't spend API quota
+WEATHER_CACHE_TTL = 600
+SEARCH_CACHE_TTL = 3600
+API_CACHE_MAX_ENTRIES = 256
+_weather_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+_search_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+# City name -> (lat, lon) from OpenWeather's geocoder; coordinates don't
+# change, so entries never expire
+GEOCODE_CACHE_MAX_ENTRIES = 512
+_geocode_cache: Dict[str, Tuple[float, float]] = {}
+
+# Transient API failures (connection errors, timeouts, 429s and 5xxs) are
+# retried with exponential backoff; other errors fail immediately
+API_RETRY_ATTEMPTS = 3
+API_RETRY_BASE_DELAY = 0.5
+_RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# summarize_day.txt, read on first use
+_summarize_template: Optional[str] = None
+
+# The formatted current time, recomputed only when the clock second changes
+_utc_second: Optional[int] = None
+_utc_string = ""
+
 # Resource handlers
 @server.list_resources()
 async def handle_list_resources() -> List[Resource]:
     """List available resources (today://date, tasks://list)"""
-    return [
-        Resource(
-            uri="today://date",
-            name="Current Date and Time",
-            description="Get the current date and time",
-            mimeType="text/plain"
-        ),
-        Resource(
-            uri="tasks://list",
-            name="Task List",
-            description="Get all tasks from the task list",
-            mimeType="application/json"
-        )
-    ]
+    return RESOURCES
 
 @server.read_resource()
 async def handle_read_resource(uri: str) -> str:
     """Read resource content by URI"""
     if uri == "today://date":
-        current_time = datetime.utcnow()
-        return current_time.strftime("%Y-%m-%d %H:%M:%S UTC")
+        return current_utc_string()
     
     elif uri == "tasks://list":
         tasks = await load_tasks()
-        return json.dumps([task.to_dict() for task in tasks], indent=2)
+        # orjson serializes the Task dataclasses natively, with no per-task dicts
+        return orjson.dumps(tasks, option=orjson.OPT_INDENT_2).decode()
     
     else:
         raise ValueError(f"Unknown resource URI: {uri}")
@@ -82,203 +221,339 @@ async def handle_read_resource(uri: str) -> str:
 @server.list_tools()
 async def handle_list_tools() -> List[Tool]:
     """List available tools"""
-    return [
-        Tool(
-            name="add_task",
-            description="Add a new task to the task list",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "description": {
-                        "type": "string",
-                        "description": "Task description"
-                    },
-                    "due_date": {
-                        "type": "string",
-                        "description": "Due date in ISO format (YYYY-MM-DD)"
-                    },
-                    "priority": {
-                        "type": "string",
-                        "enum": ["low", "medium", "high"],
-                        "description": "Task priority",
-                        "default": "medium"
-                    }
-                },
-                "required": ["description", "due_date"]
-            }
-        ),
-        Tool(
-            name="remove_task",
-            description="Remove a task from the task list",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "id": {
-                        "type": "string",
-                        "description": "Task ID to remove"
-                    }
-                },
-                "required": ["id"]
-            }
-        ),
-        Tool(
-            name="get_weather",
-            description="Get weather information for a city",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "city": {
-                        "type": "string",
-                        "description": "City name"
-                    }
-                },
-                "required": ["city"]
-            }
-        ),
-        Tool(
-            name="search_web",
-            description="Search the web using Tavily API",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "query": {
-                        "type": "string",
-                        "description": "Search query"
-                    }
-                },
-                "required": ["query"]
-            }
-        )
-    ]
+    return TOOLS
+
+# Tool name -> coroutine factory taking the call's arguments
+TOOL_DISPATCH: Dict[str, Callable[[Dict[str, Any]], Awaitable[str]]] = {
+    "add_task": lambda a: add_task_tool(a["description"], a["due_date"], a.get("priority", "medium")),
+    "remove_task": lambda a: remove_task_tool(a["id"]),
+    "get_weather": lambda a: get_weather_tool(a["city"]),
+    "search_web": lambda a: search_web_tool(a["query"]),
+}
 
 @server.call_tool()
 async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
     """Execute tool by name with arguments"""
-    try:
-        if name == "add_task":
-            result = await add_task_tool(
-                arguments["description"],
-                arguments["due_date"],
-                arguments.get("priority", "medium")
-            )
-            return [TextContent(type="text", text=result)]
-        
-        elif name == "remove_task":
-            result = await remove_task_tool(arguments["id"])
-            return [TextContent(type="text", text=result)]
-        
-        elif name == "get_weather":
-            result = await get_weather_tool(arguments["city"])
-            return [TextContent(type="text", text=result)]
-        
-        elif name == "search_web":
-            result = await search_web_tool(arguments["query"])
-            return [TextContent(type="text", text=result)]
-        
-        else:
-            raise ValueError(f"Unknown tool: {name}")
+    handler = TOOL_DISPATCH.get(name)
+    if handler is None:
+        raise ValueError(f"Unknown tool: {name}")
     
-    except Exception as e:
-        error_msg = f"Error executing tool {name}: {str(e)}"
-        return [TextContent(type="text", text=error_msg)]
+    # The tools report their own failures; only bad arguments are handled here
+    try:
+        result = await handler(arguments)
+    except KeyError as e:
+        result = f"Error executing tool {name}: missing required argument {e}"
+    return [TextContent(type="text", text=result)]
 
 # Prompt handlers
 @server.list_prompts()
 async def handle_list_prompts() -> List[Prompt]:
     """List available prompts"""
-    return [
-        Prompt(
-            name="summarize_day",
-            description="Generate a daily summary with tasks, weather, and search results",
-            arguments=[
-                {
-                    "name": "city",
-                    "description": "City for weather information",
-                    "required": False
-                },
-                {
-                    "name": "search_query",
-                    "description": "Optional search query for additional context",
-                    "required": False
-                }
-            ]
-        )
-    ]
+    return PROMPTS
+
+# Prompt name -> coroutine factory taking the prompt's arguments
+PROMPT_DISPATCH: Dict[str, Callable[[Dict[str, str]], Awaitable[str]]] = {
+    "summarize_day": lambda a: get_summarize_day_prompt(a),
+}
 
 @server.get_prompt()
 async def handle_get_prompt(name: str, arguments: Dict[str, str]) -> str:
     """Get prompt template with arguments"""
-    if name == "summarize_day":
-        return await get_summarize_day_prompt(arguments)
-    else:
+    handler = PROMPT_DISPATCH.get(name)
+    if handler is None:
         raise ValueError(f"Unknown prompt: {name}")
+    return await handler(arguments)
 
 # Helper functions
+async def get_task_store() -> Dict[str, Task]:
+    """The cached tasks by id, reloaded first if tasks.json changed on disk
+    
+    This is the cache itself: callers that modify it must call
+    save_task_store() afterwards.
+    """
+    global _tasks_cache, _tasks_mtime_ns
+    async with _tasks_lock:
+        # Unflushed changes take precedence over the file
+        if _tasks_dirty.is_set() and _tasks_cache is not None:
+            return _tasks_cache
+        
+        # A stat is cheaper inline than a hop to a worker thread
+        try:
+            mtime_ns = TASKS_FILE.stat().st_mtime_ns
+        except FileNotFoundError:
+            _tasks_cache = {}
+            _tasks_mtime_ns = None
+            return _tasks_cache
+        
+        if _tasks_cache is None or mtime_ns != _tasks_mtime_ns:
+            # Read off the event loop so other requests keep being served
+            raw = await asyncio.to_thread(TASKS_FILE.read_bytes)
+            data = orjson.loads(raw)
+            del raw
+            
+            # Consume the parsed list while building Tasks, so each dict is
+            # freed as its Task is created rather than both copies of a large
+            # file being held at once
+            data.reverse()
+            tasks = {}
+            invalid = 0
+            first_error = None
+            while data:
+                task_data = data.pop()
+                try:
+                    task = Task.from_dict(task_data)
+                    tasks[task.id] = task
+                except (TypeError, ValueError) as e:
+                    invalid += 1
+                    first_error = first_error or e
+                    continue
+            
+            if invalid:
+                logger.warning("Skipped %d invalid task(s) in %s: %s", invalid, TASKS_FILE, first_error)
+            
+            _tasks_cache = tasks
+            _tasks_mtime_ns = mtime_ns
+        
+        return _tasks_cache
+
 async def load_tasks() -> List[Task]:
-    """Load tasks from tasks.json file"""
+    """Load tasks from tasks.json file
+    
+    Served from memory unless the file changed on disk since it was last
+    read or written. Returns a new list, so callers may modify it freely.
+    """
     try:
-        if not TASKS_FILE.exists():
-            return []
-        
-        with open(TASKS_FILE, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        tasks = []
-        for task_data in data:
-            try:
-                task = Task.from_dict(task_data)
-                tasks.append(task)
-            except ValueError as e:
-                print(f"Warning: Invalid task data: {e}")
-                continue
-        
-        return tasks
+        return list((await get_task_store()).values())
     except Exception as e:
-        print(f"Error loading tasks: {e}")
+        logger.error("Error loading tasks: %s", e)
         return []
 
 async def save_tasks(tasks: List[Task]) -> None:
-    """Save tasks to tasks.json file"""
+    """Save tasks to tasks.json file, replacing the cached tasks"""
+    global _tasks_cache
+    async with _tasks_lock:
+        _tasks_cache = {task.id: task for task in tasks}
+    await save_task_store()
+
+async def save_task_store() -> None:
+    """Persist the cached tasks, via the flusher when it is running"""
+    global _tasks_cache
+    if _tasks_flusher is not None and not _tasks_flusher.done():
+        _tasks_dirty.set()
+        return
+    
     try:
-        # Ensure directory exists
-        TASKS_FILE.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Convert tasks to dictionaries
-        task_data = [task.to_dict() for task in tasks]
-        
-        # Write to temporary file first
-        temp_file = TASKS_FILE.with_suffix('.tmp')
-        with open(temp_file, 'w', encoding='utf-8') as f:
-            json.dump(task_data, f, indent=2, ensure_ascii=False)
-        
-        # Atomic move
-        temp_file.replace(TASKS_FILE)
-    except Exception as e:
-        print(f"Error saving tasks: {e}")
+        await write_task_store()
+    except Exception:
+        # The caller sees the error, so fall back to what's on disk rather
+        # than keep changes it was told failed
+        async with _tasks_lock:
+            _tasks_cache = None
         raise
 
+async def flush_tasks_loop() -> None:
+    """Coalesce bursts of task changes into a single tasks.json write"""
+    failures = 0
+    while True:
+        await _tasks_dirty.wait()
+        await asyncio.sleep(min(TASKS_SAVE_DELAY * 2 ** failures, TASKS_RETRY_MAX_DELAY))
+        _tasks_dirty.clear()
+        try:
+            await write_task_store()
+            failures = 0
+        except Exception:
+            # The changes were already reported as saved, so keep them in the
+            # cache (dirty, so it isn't reloaded from disk) and try again
+            _tasks_dirty.set()
+            failures = min(failures + 1, 10)
+
+def start_tasks_flusher() -> None:
+    """Start the background writer for tasks.json"""
+    global _tasks_flusher
+    if _tasks_flusher is None or _tasks_flusher.done():
+        _tasks_flusher = asyncio.create_task(flush_tasks_loop())
+
+async def stop_tasks_flusher() -> None:
+    """Stop the background writer, flushing any pending changes"""
+    global _tasks_flusher
+    if _tasks_flusher is not None:
+        _tasks_flusher.cancel()
+        try:
+            await _tasks_flusher
+        except asyncio.CancelledError:
+            pass
+        _tasks_flusher = None
+    
+    if _tasks_dirty.is_set():
+        _tasks_dirty.clear()
+        await write_task_store()
+
+async def write_task_store() -> None:
+    """Write the cached tasks to tasks.json"""
+    global _tasks_mtime_ns
+    # Held across the write, so the cache can't be reloaded or modified
+    # while it is being saved
+    async with _tasks_lock:
+        if _tasks_cache is None:
+            return
+        
+        try:
+            # orjson serializes the Task dataclasses natively, with no per-task dicts
+            task_data = orjson.dumps(list(_tasks_cache.values()), option=orjson.OPT_INDENT_2)
+            
+            # The cache now matches the file, so the next load is served from memory
+            _tasks_mtime_ns = await asyncio.to_thread(write_tasks_file, task_data)
+        except Exception as e:
+            # The cache is left as is; the caller decides whether to keep it
+            logger.error("Error saving tasks: %s", e)
+            raise
+
+def write_tasks_file(task_data: bytes) -> int:
+    """Atomically replace tasks.json, returning its new st_mtime_ns
+    
+    Blocking; run in a worker thread.
+    """
+    # Ensure directory exists
+    TASKS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    
+    # Write to temporary file first
+    temp_file = TASKS_FILE.with_suffix('.tmp')
+    with open(temp_file, 'wb') as f:
+        f.write(task_data)
+    
+    # Atomic move
+    temp_file.replace(TASKS_FILE)
+    return TASKS_FILE.stat().st_mtime_ns
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared HTTP client for outbound API calls, creating it on first use"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=10.0,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100)
+        )
+    return _http_client
+
+async def close_http_client():
+    """Close the shared HTTP client, if it was created"""
+    global _http_client
+    if _http_client is not None:
+        client, _http_client = _http_client, None
+        await client.aclose()
+
+def current_utc_string() -> str:
+    """The current UTC time as "YYYY-MM-DD HH:MM:SS UTC" """
+    global _utc_second, _utc_string
+    second = int(time.time())
+    if second != _utc_second:
+        _utc_string = datetime.fromtimestamp(second, timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+        _utc_second = second
+    return _utc_string
+
+async def send_with_retry(request: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+    """Send a request, retrying transient failures with exponential backoff"""
+    async def send() -> httpx.Response:
+        response = await request()
+        response.raise_for_status()
+        return response
+    
+    for attempt in range(API_RETRY_ATTEMPTS - 1):
+        try:
+            return await send()
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code not in _RETRYABLE_STATUSES:
+                raise
+        except httpx.TransportError:
+            # Connection failures and timeouts
+            pass
+        await asyncio.sleep(API_RETRY_BASE_DELAY * 2 ** attempt + random.random() * 0.1)
+    
+    # Last attempt: let any error propagate
+    return await send()
+
+def get_cached_response(cache: Dict[str, Tuple[float, Dict[str, Any]]],
+                        key: str, ttl: float) -> Optional[Dict[str, Any]]:
+    """Return a cached API response if it is younger than ttl seconds"""
+    entry = cache.get(key)
+    if entry is not None and time.monotonic() - entry[0] < ttl:
+        return entry[1]
+    return None
+
+def store_cached_response(cache: Dict[str, Tuple[float, Dict[str, Any]]],
+                          key: str, data: Dict[str, Any], ttl: float) -> None:
+    """Cache an API response, pruning expired entries when the cache is full"""
+    now = time.monotonic()
+    if len(cache) >= API_CACHE_MAX_ENTRIES:
+        for stale in [k for k, (ts, _) in cache.items() if now - ts >= ttl]:
+            del cache[stale]
+        if len(cache) >= API_CACHE_MAX_ENTRIES:
+            # Still full: drop the oldest entry
+            del cache[next(iter(cache))]
+    cache[key] = (now, data)
+
+async def geocode_city(city: str, cache_key: str) -> Optional[Tuple[float, float]]:
+    """Resolve a city name to (lat, lon) with OpenWeather's geocoder (cached)"""
+    coords = _geocode_cache.get(cache_key)
+    if coords is not None:
+        return coords
+    
+    url = "http://api.openweathermap.org/geo/1.0/direct"
+    params = {
+        "q": city,
+        "limit": 1,
+        "appid": OPENWEATHER_API_KEY
+    }
+    
+    response = await send_with_retry(lambda: get_http_client().get(url, params=params))
+    matches = response.json()
+    if not matches:
+        return None
+    
+    coords = (matches[0]["lat"], matches[0]["lon"])
+    if len(_geocode_cache) >= GEOCODE_CACHE_MAX_ENTRIES:
+        del _geocode_cache[next(iter(_geocode_cache))]
+    _geocode_cache[cache_key] = coords
+    return coords
+
 async def get_weather_data(city: str) -> Dict[str, Any]:
-    """Fetch weather data from OpenWeather API"""
+    """Fetch weather data from OpenWeather API (cached for WEATHER_CACHE_TTL)"""
     if not OPENWEATHER_API_KEY:
         raise ValueError("OpenWeather API key not configured")
     
+    cache_key = city.strip().lower()
+    cached = get_cached_response(_weather_cache, cache_key, WEATHER_CACHE_TTL)
+    if cached is not None:
+        return cached
+    
     url = "http://api.openweathermap.org/data/2.5/weather"
     params = {
-        "q": city,
         "appid": OPENWEATHER_API_KEY,
         "units": "metric"
     }
     
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, params=params)
-        response.raise_for_status()
-        return response.json()
+    # Query by coordinates when the geocoder knows the city; otherwise let the
+    # weather API resolve the name itself (and report unknown cities)
+    coords = await geocode_city(city, cache_key)
+    if coords is not None:
+        params["lat"], params["lon"] = coords
+    else:
+        params["q"] = city
+    
+    response = await send_with_retry(lambda: get_http_client().get(url, params=params))
+    weather_data = response.json()
+    store_cached_response(_weather_cache, cache_key, weather_data, WEATHER_CACHE_TTL)
+    return weather_data
 
 async def search_web_tavily(query: str) -> Dict[str, Any]:
-    """Search web using Tavily API"""
+    """Search web using Tavily API (cached for SEARCH_CACHE_TTL)"""
     if not TAVILY_API_KEY:
         raise ValueError("Tavily API key not configured")
     
+    cached = get_cached_response(_search_cache, query, SEARCH_CACHE_TTL)
+    if cached is not None:
+        return cached
+    
     url = "https://api.tavily.com/search"
     headers = {
         "Content-Type": "application/json"
@@ -293,10 +568,10 @@ async def search_web_tavily(query: str) -> Dict[str, Any]:
         "max_results": 5
     }
     
-    async with httpx.AsyncClient() as client:
-        response = await client.post(url, headers=headers, json=data)
-        response.raise_for_status()
-        return response.json()
+    response = await send_with_retry(lambda: get_http_client().post(url, headers=headers, json=data))
+    search_results = response.json()
+    store_cached_response(_search_cache, query, search_results, SEARCH_CACHE_TTL)
+    return search_results
 
 # Tool implementations
 async def add_task_tool(description: str, due_date: str, priority: str = "medium") -> str:
@@ -308,14 +583,12 @@ async def add_task_tool(description: str, due_date: str, priority: str = "medium
         # Create new task
         task = Task.create_new(description, due_date + "T23:59:59Z", priority)
         
-        # Load existing tasks
-        tasks = await load_tasks()
-        
         # Add new task
-        tasks.append(task)
+        tasks = await get_task_store()
+        tasks[task.id] = task
         
         # Save tasks
-        await save_tasks(tasks)
+        await save_task_store()
         
         return f"✅ Task added successfully: '{description}' (due: {due_date}, priority: {priority})"
     
@@ -327,18 +600,13 @@ async def add_task_tool(description: str, due_date: str, priority: str = "medium
 async def remove_task_tool(task_id: str) -> str:
     """Remove a task by ID"""
     try:
-        # Load existing tasks
-        tasks = await load_tasks()
-        
         # Find and remove task
-        original_count = len(tasks)
-        tasks = [task for task in tasks if task.id != task_id]
-        
-        if len(tasks) == original_count:
+        tasks = await get_task_store()
+        if tasks.pop(task_id, None) is None:
             return f"❌ Task with ID '{task_id}' not found"
         
         # Save updated tasks
-        await save_tasks(tasks)
+        await save_task_store()
         
         return f"✅ Task removed successfully"
     
@@ -378,39 +646,57 @@ async def search_web_tool(query: str) -> str:
         search_results = await search_web_tavily(query)
         
         # Format results
-        result_text = f"🔍 Search results for '{query}':\n\n"
+        parts = [f"🔍 Search results for '{query}':\n\n"]
         
-        if "answer" in search_results and search_results["answer"]:
-            result_text += f"**Answer:** {search_results['answer']}\n\n"
+        answer = search_results.get("answer")
+        if answer:
+            parts.append(f"**Answer:** {answer}\n\n")
         
         if "results" in search_results:
             for i, result in enumerate(search_results["results"][:3], 1):
                 title = result.get("title", "No title")
                 url = result.get("url", "")
-                content = result.get("content", "")[:200] + "..." if len(result.get("content", "")) > 200 else result.get("content", "")
+                content = result.get("content", "")
+                if len(content) > 200:
+                    content = content[:200] + "..."
                 
-                result_text += f"**{i}. {title}**\n"
-                result_text += f"{content}\n"
-                result_text += f"Source: {url}\n\n"
+                parts.append(f"**{i}. {title}**\n{content}\nSource: {url}\n\n")
         
-        return result_text
+        return "".join(parts)
     
     except Exception as e:
         return f"❌ Error searching web: {str(e)}"
 
+async def _none() -> None:
+    """Placeholder for an optional fetch that wasn't requested"""
+    return None
+
 async def get_summarize_day_prompt(arguments: Dict[str, str]) -> str:
     """Get the summarize_day prompt with current data"""
+    global _summarize_template
     try:
-        # Load prompt template
-        prompt_file = PROMPTS_DIR / "summarize_day.txt"
-        with open(prompt_file, 'r', encoding='utf-8') as f:
-            template = f.read()
+        # Load prompt template (once; it doesn't change at runtime)
+        if _summarize_template is None:
+            prompt_file = PROMPTS_DIR / "summarize_day.txt"
+            _summarize_template = await asyncio.to_thread(prompt_file.read_text, encoding='utf-8')
+        template = _summarize_template
         
         # Get current data
-        current_datetime = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
+        current_datetime = current_utc_string()
+        city = arguments.get("city")
+        search_query = arguments.get("search_query")
+        
+        # Tasks, weather and search are independent, so fetch them concurrently
+        tasks, weather_data, search_results = await asyncio.gather(
+            load_tasks(),
+            get_weather_data(city) if city else _none(),
+            search_web_tavily(search_query) if search_query else _none(),
+            return_exceptions=True
+        )
         
         # Get tasks
-        tasks = await load_tasks()
+        if isinstance(tasks, BaseException):
+            raise tasks
         tasks_text = "\n".join([
             f"- {task.description} (due: {task.due_date[:10]}, priority: {task.priority})"
             for task in tasks if not task.completed
@@ -420,26 +706,25 @@ async def get_summarize_day_prompt(arguments: Dict[str, str]) -> str:
         
         # Get weather if city provided
         weather_text = "Weather information not requested"
-        if "city" in arguments and arguments["city"]:
+        if city:
             try:
-                weather_data = await get_weather_data(arguments["city"])
+                if isinstance(weather_data, BaseException):
+                    raise weather_data
                 main = weather_data["main"]
                 weather = weather_data["weather"][0]
-                weather_text = f"{arguments['city']}: {weather['description'].title()}, {main['temp']}°C"
-            except:
-                weather_text = f"Could not get weather for {arguments['city']}"
+                weather_text = f"{city}: {weather['description'].title()}, {main['temp']}°C"
+            except Exception:
+                weather_text = f"Could not get weather for {city}"
         
         # Get search results if query provided
         search_text = "No search performed"
-        if "search_query" in arguments and arguments["search_query"]:
-            try:
-                search_results = await search_web_tavily(arguments["search_query"])
-                if "answer" in search_results and search_results["answer"]:
-                    search_text = f"Search for '{arguments['search_query']}': {search_results['answer']}"
-                else:
-                    search_text = f"Search performed for '{arguments['search_query']}' but no clear answer found"
-            except:
-                search_text = f"Could not perform search for '{arguments['search_query']}'"
+        if search_query:
+            if isinstance(search_results, BaseException):
+                search_text = f"Could not perform search for '{search_query}'"
+            elif search_results.get("answer"):
+                search_text = f"Search for '{search_query}': {search_results['answer']}"
+            else:
+                search_text = f"Search performed for '{search_query}' but no clear answer found"
         
         # Substitute variables
         prompt = template.format(
@@ -458,6 +743,7 @@ async def main():
     """Run the server using stdio transport"""
     logging.basicConfig(level=logging.DEBUG, filename="pa_server.log")
     logging.debug("Personal Assistant Server: Main function started.")
+    start_tasks_flusher()
     try:
         async with stdio_server() as (read_stream, write_stream):
             logging.debug("Personal Assistant Server: Stdio server started.")
@@ -481,6 +767,9 @@ async def main():
     except Exception as e:
         logging.error(f"Personal Assistant Server: An error occurred in main: {e}", exc_info=True)
         raise
+    finally:
+        await stop_tasks_flusher()
+        await close_http_client()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,43 @@
+"""
+HTTP helpers shared by the MCP HTTP servers
+"""
+import hashlib
+from typing import Any
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+
+def mcp_json_default(obj: Any) -> Any:
+    """orjson fallback for the pydantic values inside mcp types (PromptArgument
+    models, AnyUrl resource URIs)"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    return str(obj)
+
+
+def listing_etag(body: bytes) -> str:
+    """Weak ETag for a pre-serialized listing body
+    
+    Weak because GZipMiddleware may send the same listing gzip-encoded, and a
+    strong tag would then claim two different byte sequences are identical.
+    """
+    return 'W/"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def _opaque_tag(tag: str) -> str:
+    """An entity tag without its weakness prefix, for weak comparison"""
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def listing_response(request: Request, body: bytes, etag: str) -> Response:
+    """Serve a listing body, or a bodiless 304 when the client already has it"""
+    headers = {"ETag": etag}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        # If-None-Match uses weak comparison (RFC 9110 13.1.2)
+        opaque = _opaque_tag(etag)
+        if any(_opaque_tag(tag) in (opaque, "*") for tag in if_none_match.split(",")):
+            return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
@@ -2,12 +2,13 @@
 Shared data models for MCP servers
 """
 from dataclasses import dataclass, field
-from datetime import datetime
-from typing import List, Optional, Dict, Any
+from datetime import datetime, timezone
+from typing import Callable, ClassVar, List, Optional, Dict, Any, Tuple
 from enum import Enum
 import json
 import hashlib
-from pathlib import Path
+import os
+import uuid
 
 
 class ConnectionStatus(Enum):
@@ -18,81 +19,147 @@ class ConnectionStatus(Enum):
     ERROR = "error"
 
 
-@dataclass
+def file_stem(file_path: str) -> str:
+    """File name without its extension (as Path.stem), without building a Path"""
+    return os.path.splitext(os.path.basename(file_path))[0]
+
+
+def fill_timestamps(record: Any) -> None:
+    """Default a record's created_at to now and updated_at to created_at
+    
+    At most one clock read and format per record.
+    """
+    if not record.created_at:
+        record.created_at = datetime.now(timezone.utc).isoformat()
+    if not record.updated_at:
+        record.updated_at = record.created_at
+
+
+@dataclass(slots=True)
 class MCPConnection:
     """MCP server connection information"""
-    name: str
-    host: str
-    port: int
-    status: ConnectionStatus = ConnectionStatus.DISCONNECTED
+    server_name: str
+    transport_type: str
+    connection_status: str = ConnectionStatus.DISCONNECTED.value
+    host: Optional[str] = None
+    port: Optional[int] = None
     error_message: Optional[str] = None
-    tools: List[Dict[str, Any]] = field(default_factory=list)
-    resources: List[Dict[str, Any]] = field(default_factory=list)
-    prompts: List[Dict[str, Any]] = field(default_factory=list)
+    capabilities: Dict[str, Any] = field(default_factory=dict)
+    # Epoch seconds of the last successful exchange; cheap to set and serialize
+    last_ping: Optional[int] = None
+    # Called with the connection after every status change (e.g. by the manager
+    # to keep its connected-set in sync)
+    on_status_change: Optional[Callable[["MCPConnection"], None]] = field(
+        default=None, repr=False, compare=False
+    )
+    
+    @property
+    def last_ping_dt(self) -> Optional[datetime]:
+        """UTC datetime of the last successful exchange, built only when displayed"""
+        if self.last_ping is None:
+            return None
+        return datetime.fromtimestamp(self.last_ping, tz=timezone.utc)
+    
+    def update_status(self, status: str, error_message: Optional[str] = None):
+        """Update connection status and error message"""
+        self.connection_status = status
+        self.error_message = error_message
+        if self.on_status_change is not None:
+            self.on_status_change(self)
+    
+    def is_connected(self) -> bool:
+        """Check whether the connection is currently usable"""
+        return self.connection_status == ConnectionStatus.CONNECTED.value
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert connection to dictionary"""
         return {
-            "name": self.name,
+            "server_name": self.server_name,
+            "transport_type": self.transport_type,
+            "connection_status": self.connection_status,
             "host": self.host,
             "port": self.port,
-            "status": self.status.value,
             "error_message": self.error_message,
-            "tools": self.tools,
-            "resources": self.resources,
-            "prompts": self.prompts
+            "capabilities": self.capabilities,
+            "last_ping": self.last_ping
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class Task:
     """Task model for personal assistant"""
     id: str
-    title: str
     description: str = ""
-    completed: bool = False
-    created_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
-    updated_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
     due_date: Optional[str] = None
     priority: str = "medium"  # low, medium, high
+    completed: bool = False
+    # Filled in by __post_init__ when not given
+    created_at: str = ""
+    updated_at: str = ""
     tags: List[str] = field(default_factory=list)
     
+    # Serialized field names, in tasks.json order
+    _FIELDS: ClassVar[Tuple[str, ...]] = (
+        "id", "description", "due_date", "priority", "completed",
+        "created_at", "updated_at", "tags"
+    )
+    
+    def __post_init__(self):
+        """Default the timestamps from a single clock read"""
+        fill_timestamps(self)
+    
     def to_dict(self) -> Dict[str, Any]:
-        """Convert task to dictionary"""
+        """Convert task to dictionary (orjson can also serialize a Task directly)"""
         return {
             "id": self.id,
-            "title": self.title,
             "description": self.description,
+            "due_date": self.due_date,
+            "priority": self.priority,
             "completed": self.completed,
             "created_at": self.created_at,
             "updated_at": self.updated_at,
-            "due_date": self.due_date,
-            "priority": self.priority,
             "tags": self.tags
         }
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "Task":
-        """Create task from dictionary"""
-        return cls(**data)
+        """Create task from dictionary, ignoring unknown keys"""
+        return cls(**{name: data[name] for name in cls._FIELDS if name in data})
+    
+    @classmethod
+    def create_new(cls, description: str, due_date: Optional[str] = None, priority: str = "medium") -> "Task":
+        """Create a task with a fresh unique ID"""
+        return cls(
+            id=f"task-{uuid.uuid4().hex[:8]}",
+            description=description,
+            due_date=due_date,
+            priority=priority
+        )
 
 
-@dataclass
+@dataclass(slots=True)
 class Note:
     """Note model for knowledge base"""
     id: str
     title: str
     content: str
     file_path: str
-    created_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
-    updated_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+    # Filled in by __post_init__ when not given
+    created_at: str = ""
+    updated_at: str = ""
     tags: List[str] = field(default_factory=list)
     word_count: int = 0
+    # Lowercased (title, content, file stem, tags) for search_relevance, built
+    # on the first search rather than for every loaded note
+    _search_fields: Optional[Tuple[str, str, str, Tuple[str, ...]]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
     
     def __post_init__(self):
-        """Calculate word count after initialization"""
+        """Calculate word count and default timestamps after initialization"""
         if self.word_count == 0:
             self.word_count = len(self.content.split())
+        fill_timestamps(self)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert note to dictionary"""
@@ -115,32 +182,22 @@ class Note:
     @classmethod
     def from_file(cls, file_path: str, content: str, title: Optional[str] = None) -> "Note":
         """Create note from file content"""
-        # Generate ID from file path
-        note_id = hashlib.md5(file_path.encode()).hexdigest()[:8]
+        # Generate ID from file path (a 4-byte blake2b digest: 8 hex chars)
+        note_id = hashlib.blake2b(file_path.encode(), digest_size=4).hexdigest()
         
         # Extract title if not provided
         if not title:
-            title = Path(file_path).stem.replace('_', ' ').replace('-', ' ').title()
+            title = file_stem(file_path).replace('_', ' ').replace('-', ' ').title()
         
         # Extract tags from content (simple implementation)
-        tags = []
-        content_lower = content.lower()
-        
-        # Common programming/tech keywords as tags
-        tech_keywords = ['python', 'javascript', 'api', 'docker', 'kubernetes', 
-                        'machine learning', 'ai', 'database', 'sql', 'nosql',
-                        'react', 'vue', 'angular', 'nodejs', 'async', 'sync']
-        
-        for keyword in tech_keywords:
-            if keyword in content_lower:
-                tags.append(keyword)
+        tags = extract_tags(content.lower(), limit=5)  # Limit to 5 tags
         
         return cls(
             id=note_id,
             title=title,
             content=content,
             file_path=file_path,
-            tags=tags[:5]  # Limit to 5 tags
+            tags=tags
         )
     
     def search_relevance(self, keyword: str) -> float:
@@ -148,25 +205,84 @@ class Note:
         keyword_lower = keyword.lower()
         score = 0.0
         
+        if self._search_fields is None:
+            self._search_fields = (
+                self.title.lower(),
+                self.content.lower(),
+                file_stem(self.file_path).lower(),
+                tuple(tag.lower() for tag in self.tags)
+            )
+        title_lower, content_lower, stem_lower, tags_lower = self._search_fields
+        
         # Title match (highest weight)
-        if keyword_lower in self.title.lower():
+        if keyword_lower in title_lower:
             score += 10.0
             # Exact match bonus
-            if keyword_lower == self.title.lower():
+            if keyword_lower == title_lower:
                 score += 5.0
         
-        # Content matches
-        content_lower = self.content.lower()
-        occurrences = content_lower.count(keyword_lower)
+        # Content matches; the score caps at 10 occurrences, so stop there
+        # rather than scan the rest of a long note
+        occurrences = 0
+        position = 0
+        step = len(keyword_lower) or 1  # count() semantics for an empty keyword
+        while occurrences < 10:
+            position = content_lower.find(keyword_lower, position)
+            if position < 0:
+                break
+            occurrences += 1
+            position += step
         score += min(occurrences * 0.5, 5.0)  # Cap at 5 points for content
         
         # Tag match
-        for tag in self.tags:
-            if keyword_lower in tag.lower():
+        for tag in tags_lower:
+            if keyword_lower in tag:
                 score += 2.0
         
         # File name match
-        if keyword_lower in Path(self.file_path).stem.lower():
+        if keyword_lower in stem_lower:
             score += 3.0
         
-        return score
\ No newline at end of file
+        return score
+
+
+# Common programming/tech keywords as tags, in tag order
+TECH_KEYWORDS = (
+    'python', 'javascript', 'api', 'docker', 'kubernetes',
+    'machine learning', 'ai', 'database', 'sql', 'nosql',
+    'react', 'vue', 'angular', 'nodejs', 'async', 'sync'
+)
+
+
+def _build_tag_automaton():
+    """Aho-Corasick automaton over TECH_KEYWORDS, if pyahocorasick is installed"""
+    try:
+        import ahocorasick
+    except ImportError:
+        return None
+    automaton = ahocorasick.Automaton()
+    for index, keyword in enumerate(TECH_KEYWORDS):
+        automaton.add_word(keyword, index)
+    automaton.make_automaton()
+    return automaton
+
+
+_tag_automaton = _build_tag_automaton()
+
+
+def extract_tags(content_lower: str, limit: int = len(TECH_KEYWORDS)) -> List[str]:
+    """The first `limit` tech keywords found in lowercased content, in
+    TECH_KEYWORDS order"""
+    if _tag_automaton is not None:
+        # One pass over the content finds every keyword, overlaps included
+        found = {index for _, index in _tag_automaton.iter(content_lower)}
+        return [TECH_KEYWORDS[index] for index in sorted(found)[:limit]]
+    
+    # Fallback: one substring scan per keyword, stopping once the limit is hit
+    tags = []
+    for keyword in TECH_KEYWORDS:
+        if keyword in content_lower:
+            tags.append(keyword)
+            if len(tags) == limit:
+                break
+    return tags
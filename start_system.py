@@ -16,8 +16,11 @@ Requirements:
     - Virtual environment activated (recommended)
 """
 
+import queue
+import socket
 import subprocess
 import sys
+import threading
 import time
 import os
 from pathlib import Path
@@ -41,18 +44,38 @@ def check_requirements():
     print("✅ Requirements check passed!")
     return True
 
+# How long a service may take to start accepting connections
+STARTUP_TIMEOUT = 15.0
+
+def wait_for_port(port, process, timeout=STARTUP_TIMEOUT):
+    """Wait until localhost:port accepts connections or the process exits
+    
+    Returns True once the port is accepting connections.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            return False
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return True
+        except OSError:
+            time.sleep(0.05)
+    return False
+
 def start_server(name, command, port):
-    """Start a server process"""
+    """Start a server process from an argv list (no intermediate shell)"""
     print(f"🚀 Starting {name} on port {port}...")
     try:
         process = subprocess.Popen(
             command,
-            shell=True,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             text=True
         )
-        time.sleep(2)  # Give the server time to start
+        # Give the server time to start, returning as soon as it is listening
+        if not wait_for_port(port, process) and process.poll() is None:
+            print(f"⚠️  {name} is not accepting connections on port {port} yet")
         
         # Check if process is still running
         if process.poll() is None:
@@ -68,6 +91,21 @@ def start_server(name, command, port):
         print(f"❌ Error starting {name}: {e}")
         return None
 
+def watch_processes(processes):
+    """Report each process's exit on the returned queue, as it happens
+    
+    One daemon thread per process blocks in wait(), so nothing polls.
+    """
+    exited = queue.Queue()
+    
+    def watch(name, process):
+        process.wait()
+        exited.put((name, process))
+    
+    for name, process in processes:
+        threading.Thread(target=watch, args=(name, process), daemon=True).start()
+    return exited
+
 def main():
     """Main startup function"""
     print("🤖 MCP Learning System Startup")
@@ -83,7 +121,7 @@ def main():
         # Start Personal Assistant Server
         pa_process = start_server(
             "Personal Assistant Server",
-            f'"{sys.executable}" -m servers.personal_assistant.http_server',
+            [sys.executable, "-m", "servers.personal_assistant.http_server"],
             8001
         )
         if pa_process:
@@ -92,7 +130,7 @@ def main():
         # Start Knowledge Base Server
         kb_process = start_server(
             "Knowledge Base Server",
-            f'"{sys.executable}" -m servers.knowledge_base.http_server',
+            [sys.executable, "-m", "servers.knowledge_base.http_server"],
             8002
         )
         if kb_process:
@@ -101,7 +139,7 @@ def main():
         # Start Streamlit Web Interface
         streamlit_process = start_server(
             "Streamlit Web Interface",
-            f'"{sys.executable}" -m streamlit run client/streamlit_chat.py --server.port 8501',
+            [sys.executable, "-m", "streamlit", "run", "client/streamlit_chat.py", "--server.port", "8501"],
             8501
         )
         if streamlit_process:
@@ -123,13 +161,16 @@ def main():
         print("   - Use /inspect command to see all available tools")
         print("\n⏹️  Press Ctrl+C to stop all services")
         
-        # Keep the script running and monitor processes
+        # Keep the script running and report processes as soon as they exit
+        exited = watch_processes(processes)
         while True:
-            time.sleep(5)
-            # Check if any process has died
-            for name, process in processes:
-                if process.poll() is not None:
-                    print(f"⚠️  {name} process has stopped unexpectedly")
+            try:
+                # The timeout only keeps Ctrl+C responsive (a bare get() can't
+                # be interrupted on Windows); exits are reported immediately
+                name, process = exited.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            print(f"⚠️  {name} process has stopped unexpectedly (exit code {process.returncode})")
     
     except KeyboardInterrupt:
         print("\n🛑 Shutting down MCP Learning System...")
@@ -0,0 +1,57 @@
+"""
+Tests for the local intent router in the Streamlit chat client.
+"""
+
+import pytest
+
+pytest.importorskip("streamlit")
+pytest.importorskip("google.generativeai")
+
+from client.streamlit_chat import route_intent
+from client.utils import sanitize_input
+
+
+class ConnectedManager:
+    """Stand-in for HTTPMCPManager with every server connected"""
+    def is_server_connected(self, server_name: str) -> bool:
+        return True
+
+
+def route(text: str):
+    """Route a message the way process_user_message does, after sanitizing it"""
+    return route_intent(sanitize_input(text), ConnectedManager())
+
+
+@pytest.mark.parametrize("text, city", [
+    ("What's the weather in New York?", "New York"),
+    ("what is the weather in New York", "New York"),
+    ("weather for Paris.", "Paris"),
+    ("What's the weather in St. Louis?", "St. Louis"),
+    ("weather in Rio de Janeiro!", "Rio de Janeiro"),
+])
+def test_weather_requests_route_to_get_weather(text, city):
+    operation = route(text)
+    assert operation == {
+        "type": "tool",
+        "server": "personal_assistant",
+        "name": "get_weather",
+        "arguments": {"city": city},
+    }
+
+
+@pytest.mark.parametrize("text", [
+    "weather in Paris tomorrow",
+    "Weather in Paris Tomorrow",
+    "whats the weather in Paris on Friday",
+    "weather in Tokyo and Paris",
+])
+def test_weather_requests_with_trailing_words_fall_through(text):
+    assert route(text) is None
+
+
+def test_task_listing_routes_to_tasks_resource():
+    assert route("Show me my tasks") == {
+        "type": "resource",
+        "server": "personal_assistant",
+        "name": "tasks://list",
+    }